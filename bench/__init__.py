@@ -0,0 +1,11 @@
+"""
+Headless benchmarks for the editor (old.py).
+
+    SDL_VIDEODRIVER=dummy python -m bench.run --sizes 1000 10000 --out base.json
+    SDL_VIDEODRIVER=dummy python -m bench.run --sizes 1000 10000 --out new.json
+    python -m bench.compare base.json new.json --threshold 0.15
+
+UINode construction (pig_ui front end, src/ui):
+
+    SDL_VIDEODRIVER=dummy python -m bench.ui_nodes --counts 1000 10000
+"""
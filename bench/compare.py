@@ -0,0 +1,77 @@
+"""
+Compares two bench.run result files and fails on regressions.
+
+    python -m bench.compare base.json new.json [--threshold 0.15] [--min-delta 0.05]
+        [--limit draw=0.25 --limit load_json=0.3 ...]
+
+A benchmark regressed if its median got slower by more than the threshold
+(relative) AND by more than --min-delta milliseconds (noise floor for very
+fast calls). Exit code 1 if anything regressed.
+"""
+import argparse
+import json
+import sys
+
+
+def parse_limits(entries):
+    limits = {}
+    for entry in entries:
+        name, _, value = entry.partition("=")
+        limits[name] = float(value)
+    return limits
+
+
+def compare(base, new, threshold=0.15, min_delta=0.05, limits=None):
+    """Returns rows (size, name, base ms, new ms, ratio, status) for all shared benchmarks."""
+    limits = limits or {}
+    rows = []
+    for size, base_results in base["results"].items():
+        new_results = new["results"].get(size)
+        if new_results is None:
+            continue
+        for name, base_row in base_results.items():
+            new_row = new_results.get(name)
+            if not isinstance(base_row, dict) or not isinstance(new_row, dict):
+                continue
+            before, after = base_row["median_ms"], new_row["median_ms"]
+            ratio = after / before if before else float("inf")
+            limit = limits.get(name, threshold)
+            if ratio > 1 + limit and after - before > min_delta:
+                status = "REGRESSION"
+            elif ratio < 1 - limit and before - after > min_delta:
+                status = "faster"
+            else:
+                status = "ok"
+            rows.append((size, name, before, after, ratio, status))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative slowdown")
+    parser.add_argument("--min-delta", type=float, default=0.05, help="ignore slowdowns below this many ms")
+    parser.add_argument("--limit", action="append", default=[], metavar="NAME=THRESHOLD",
+                        help="threshold for a single benchmark")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    rows = compare(base, new, args.threshold, args.min_delta, parse_limits(args.limit))
+    print(f"{base['meta'].get('commit')} -> {new['meta'].get('commit')}")
+    for size, name, before, after, ratio, status in rows:
+        print(f"{size:>8} {name:<20}{before:>10.3f}{after:>10.3f} ms  x{ratio:5.2f}  {status}")
+
+    regressions = [row for row in rows if row[5] == "REGRESSION"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s)")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Synthetic graphs from the NodeFactory presets.
+
+Nodes are laid out on a jittered grid (like a user would place them) and
+edges mostly connect nearby nodes, with a share of long edges across the
+whole graph.
+"""
+import math
+import random
+
+from old import Edge
+
+GRID_X = 260
+GRID_Y = 160
+
+
+def build_graph(editor, node_count, edge_density=1.0, long_edges=0.1, seed=0):
+    """Fills an (empty) editor with node_count nodes and about edge_density edges per node.
+    Returns (nodes, edges)."""
+    rng = random.Random(seed)
+    presets = editor.factory.presets
+    columns = max(1, int(math.sqrt(node_count * GRID_Y / GRID_X)))
+
+    nodes = []
+    for i in range(node_count):
+        row, column = divmod(i, columns)
+        x = column * GRID_X + rng.uniform(0, GRID_X * 0.2)
+        y = row * GRID_Y + rng.uniform(0, GRID_Y * 0.2)
+        nodes.append(editor.add_node(rng.choice(presets).create_node(x, y)))
+
+    with_outputs = [i for i, node in enumerate(nodes) if node.outputs]
+    target = int(node_count * edge_density)
+    edges = []
+    attempts = 0
+    while len(edges) < target and attempts < target * 10 and with_outputs:
+        attempts += 1
+        i = rng.choice(with_outputs)
+        start = nodes[i]
+        if rng.random() < long_edges:
+            end = rng.choice(nodes)
+        else:
+            # Nachbar rechts daneben oder in der nächsten Zeile
+            end = nodes[(i + rng.randint(1, 2) + rng.randint(0, 1) * columns) % node_count]
+        if end is start or not end.inputs:
+            continue
+        out_sock = rng.choice(start.outputs)
+        in_sock = rng.choice(end.inputs)
+        if not editor.are_types_compatible(out_sock.data_type, in_sock.data_type):
+            continue
+        if editor.graph.find_edge(out_sock, in_sock):
+            continue
+        edges.append(editor.add_edge(Edge(out_sock, in_sock)))
+    return nodes, edges
+
+
+def graph_bounds(nodes):
+    """(x, y, w, h) of all nodes in world space."""
+    left = min(node.x for node in nodes)
+    top = min(node.y for node in nodes)
+    right = max(node.x + node.width for node in nodes)
+    bottom = max(node.y + node.height for node in nodes)
+    return left, top, right - left, bottom - top
@@ -0,0 +1,248 @@
+"""
+Times the editor's hot paths on synthetic graphs and writes the results as JSON.
+
+    SDL_VIDEODRIVER=dummy python -m bench.run [--sizes 1000 10000 100000]
+        [--edge-density 1.0] [--frames 30] [--seed 0] [--out results.json]
+
+Without --out the JSON goes to stdout; the summary table always goes to stderr.
+All times are in milliseconds per call (per frame for the draw benchmarks).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame as pg
+
+from old import NodeEditor, SCREEN_WIDTH, SCREEN_HEIGHT
+from src.node_store import HAS_NUMPY
+from bench.graphs import build_graph, graph_bounds
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def stats(samples):
+    """Summary of a list of durations in seconds."""
+    ms = [s * 1000 for s in samples]
+    return {
+        "median_ms": statistics.median(ms),
+        "min_ms": min(ms),
+        "mean_ms": statistics.fmean(ms),
+        "runs": len(ms)
+    }
+
+
+def timed(fn, args_list):
+    """Calls fn(*args) for every entry and returns the single durations."""
+    samples = []
+    for args in args_list:
+        t = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - t)
+    return samples
+
+
+def center_view(editor, nodes, scale):
+    """Zooms to scale around the center of the graph."""
+    x, y, w, h = graph_bounds(nodes)
+    editor.set_scale(scale, (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+    editor.offset_x = SCREEN_WIDTH / 2 - (x + w / 2) * scale
+    editor.offset_y = SCREEN_HEIGHT / 2 - (y + h / 2) * scale
+
+
+def draw_frame(editor, surface):
+    surface.fill((0, 0, 0))
+    editor.draw(surface)
+
+
+def dirty_frame(editor, surface, back_buffer):
+    """Redraws only the damaged regions, like main_loop with DIRTY_RECT_RENDERING."""
+    for rect in editor.damage.pop():
+        back_buffer.fill((0, 0, 0), rect)
+        editor.draw(back_buffer, rect)
+        surface.blit(back_buffer, rect, rect)
+
+
+def run_size(node_count, args, rng):
+    results = {}
+    surface = pg.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    editor = NodeEditor()
+    editor.clear()
+    t = time.perf_counter()
+    nodes, edges = build_graph(editor, node_count, args.edge_density, seed=args.seed)
+    results["build"] = stats([time.perf_counter() - t])
+
+    # --- Denselben Graphen als Block einfügen (Import/Paste) ---
+    positions = {node: i for i, node in enumerate(nodes)}
+    entries = [(node.preset_name, node.x, node.y) for node in nodes]
+    connections = [
+        (positions[edge.start_socket.node], edge.start_socket.name, positions[edge.end_socket.node], edge.end_socket.name)
+        for edge in edges
+    ]
+
+    block = NodeEditor()
+
+    def add_block():
+        block.clear()
+        block.add_block(entries, connections)
+
+    results["add_block"] = stats(timed(add_block, [()] * args.io_runs))
+    block.clear()
+
+    # --- Zeichnen ---
+    center_view(editor, nodes, 1.0)
+    draw_frame(editor, surface)
+    results["draw"] = stats(timed(draw_frame, [(editor, surface)] * args.frames))
+
+    center_view(editor, nodes, 0.25)
+    draw_frame(editor, surface)
+    results["draw_lod"] = stats(timed(draw_frame, [(editor, surface)] * args.frames))
+
+    def zoom(scale):
+        editor.set_scale(scale, (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+        draw_frame(editor, surface)
+
+    center_view(editor, nodes, 1.0)
+    scales = [1.0 * 0.9 ** i for i in range(args.frames // 2)]
+    results["zoom"] = stats(timed(zoom, [(s,) for s in scales + scales[::-1]]))
+
+    # --- Hit-Testing: halb Socket-Positionen, halb zufällige Punkte ---
+    center_view(editor, nodes, 1.0)
+    visible = [node for node in nodes if editor.is_node_visible(node)]
+    editor_offset = (editor.offset_x, editor.offset_y)
+    positions = []
+    for _ in range(args.calls):
+        if visible and rng.random() < 0.5:
+            node = rng.choice(visible)
+            socket = rng.choice(node.inputs + node.outputs)
+            positions.append((socket.get_pos(editor_offset, editor.scale),))
+        else:
+            positions.append(((rng.randrange(SCREEN_WIDTH), rng.randrange(SCREEN_HEIGHT)),))
+    results["hit_test"] = stats(timed(editor.get_socket_at_pos_global, positions))
+
+    # --- Node ziehen, nur beschädigte Bereiche neu zeichnen ---
+    if visible:
+        back_buffer = pg.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        dirty_frame(editor, surface, back_buffer)
+        node = rng.choice(visible)
+        start = node.get_global_rect(editor_offset, editor.scale).center
+        editor.events.start_drag(node, start)
+
+        def drag(i):
+            editor.events.update((start[0] + i % 40, start[1] + i % 25))
+            dirty_frame(editor, surface, back_buffer)
+
+        results["drag_dirty"] = stats(timed(drag, [(i,) for i in range(1, args.frames + 1)]))
+        editor.events.stop_drag()
+
+    # --- Verbinden und wieder trennen ---
+    with_outputs = [node for node in nodes if node.outputs]
+    with_inputs = [node for node in nodes if node.inputs]
+    pairs = []
+    while len(pairs) < args.calls and with_outputs and with_inputs:
+        out_sock = rng.choice(rng.choice(with_outputs).outputs)
+        in_sock = rng.choice(rng.choice(with_inputs).inputs)
+        if out_sock.node is not in_sock.node and editor.are_types_compatible(out_sock.data_type, in_sock.data_type):
+            pairs.append((out_sock, in_sock))
+    results["handle_connection"] = stats(timed(editor.handle_connection, pairs + pairs))
+
+    # --- Speichern / Laden (Laden mit den Standardeinstellungen, ab LAZY_LOAD_MIN_NODES lazy) ---
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("json", "ngb"):
+            path = os.path.join(tmp, f"graph.{fmt}")
+            results[f"save_{fmt}"] = stats(timed(editor.save_state, [(path,)] * args.io_runs))
+            loaded = NodeEditor()
+            results[f"load_{fmt}"] = stats(timed(loaded.load_state, [(path,)] * args.io_runs))
+            del loaded
+
+    # --- Entfernen ---
+    victims = rng.sample(nodes, min(args.calls, len(nodes)))
+    results["remove_node"] = stats(timed(editor.remove_node, [(node,) for node in victims]))
+
+    results["edges"] = len(edges)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(report, file):
+    for size, results in report["results"].items():
+        print(f"\n{size} nodes, {results['edges']} edges", file=file)
+        for name, row in results.items():
+            if name == "edges":
+                continue
+            print(f"  {name:<20}{row['median_ms']:>10.3f} ms  (min {row['min_ms']:.3f}, {row['runs']} runs)", file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless editor benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--edge-density", type=float, default=1.0, help="edges per node")
+    parser.add_argument("--frames", type=int, default=30, help="frames per draw benchmark")
+    parser.add_argument("--calls", type=int, default=200, help="calls per hit-test/connection/remove benchmark")
+    parser.add_argument("--io-runs", type=int, default=3, help="runs per save/load benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="JSON file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pg.version.ver,
+            "numpy": HAS_NUMPY,
+            "edge_density": args.edge_density,
+            "frames": args.frames,
+            "calls": args.calls,
+            "io_runs": args.io_runs,
+            "seed": args.seed
+        },
+        "results": {}
+    }
+
+    # Der Editor lädt/speichert nodes_save.json im Arbeitsverzeichnis
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for size in args.sizes:
+                rng = random.Random(args.seed)
+                # Der Editor meldet jede Verbindung/jedes Speichern per print
+                with contextlib.redirect_stdout(io.StringIO()):
+                    report["results"][str(size)] = run_size(size, args, rng)
+                print(f"{size} nodes done", file=sys.stderr)
+        finally:
+            os.chdir(cwd)
+
+    print_table(report, sys.stderr)
+    text = json.dumps(report, indent=4)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Times UINode construction (pig_ui front end) with and without shared UX styles.
+
+    SDL_VIDEODRIVER=dummy python -m bench.ui_nodes [--counts 1000 10000] [--runs 3] [--out ui.json]
+
+fresh_ux builds every UX state list and parses every color per node like
+before src/ui/styles.py, shared_ux uses the style registry and compact
+additionally draws the sockets from the node's socket table
+(UINODE_COMPACT_SOCKETS). Every run gets a new App, so no run sees the
+elements of an earlier one. The JSON has the same layout as bench.run, so
+bench.compare works on it.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from pygame import Vector2
+
+from src.ui.utils import App, UINode
+from src.ui.styles import STYLES
+from old import DEFAULT_NODES
+from bench.run import stats, git_commit
+
+# (name, shared styles, compact sockets)
+MODES = [
+    ("fresh_ux", False, False),
+    ("shared_ux", True, False),
+    ("compact", True, True)
+]
+
+
+def preset_sockets():
+    """in_out lists of the default presets, as UINode expects them."""
+    return [
+        [[True, name, data_type] for name, data_type in preset["inputs"]] +
+        [[False, name, data_type] for name, data_type in preset["outputs"]]
+        for preset in DEFAULT_NODES
+    ]
+
+
+def build(app, sockets, count, compact):
+    for i in range(count):
+        UINode(app, Vector2(i % 50 * 150, i // 50 * 200), sockets[i % len(sockets)], compact_sockets=compact)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="UINode construction benchmark")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--out", help="JSON file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    sockets = preset_sockets()
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "runs": args.runs
+        },
+        "results": {}
+    }
+    for count in args.counts:
+        results = {}
+        for name, shared, compact in MODES:
+            STYLES.enabled = shared
+            STYLES.clear()
+            samples = []
+            for _ in range(args.runs):
+                app = App()
+                t = time.perf_counter()
+                build(app, sockets, count, compact)
+                samples.append(time.perf_counter() - t)
+            results[name] = stats(samples)
+        STYLES.enabled = True
+        report["results"][str(count)] = results
+        print(f"\n{count} nodes", file=sys.stderr)
+        for name, row in results.items():
+            print(f"  {name:<20}{row['median_ms']:>10.3f} ms  (min {row['min_ms']:.3f}, {row['runs']} runs)", file=sys.stderr)
+
+    text = json.dumps(report, indent=4)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,17 @@
+import gc
 from src.constants import *
-from src.ui.bezier import draw_beziere
+from src.ui.bezier import draw_beziere, tessellate, transform, estimate_length, segments_for_length, bounds
+from src.spatial import SpatialGrid
+from src.graph import GraphStore
+from src.evaluation import ExecutionPlan, IncrementalEvaluator, CycleError, EvaluationError
+from src.binary_save import stream_save, write_save
+from src.autosave import AutoSaver, compact_journal, JOURNAL_SUFFIX
+from src.text_cache import TEXT_CACHE
+from src.node_store import NodeArrays, HAS_NUMPY
+from src.memory import memory_report, format_report
+from src.profiler import PROFILER
+from src.dirty_rects import DirtyRegions
+from src.history import History, AddNodes, RemoveNodes, ToggleEdge, MoveNodes, Rename
 """
 Better Node Editor:
 
@@ -88,36 +100,82 @@ class TextInput:
             else:
                 self.active = False
 
-    def draw(self, surface):
+    def draw(self, surface, rect=None):
+        """Draws the input into rect (defaults to self.rect)."""
         if self.font.get_height() < FONT_MIN_SIZE_DRAW:
             return
+        rect = rect or self.rect
 
         color = WHITE if self.active else GRAY
-        pg.draw.rect(surface, color, self.rect, 2)
+        pg.draw.rect(surface, color, rect, 2)
         
-        text_surface = self.font.render(self.text, True, WHITE)
-        surface.blit(text_surface, (self.rect.x + 5, self.rect.y + 5))
+        text_surface = TEXT_CACHE.render(self.font, self.text, WHITE)
+        surface.blit(text_surface, (rect.x + 5, rect.y + 5))
         
         if self.active:
-            cursor_pos = self.rect.x + 5 + text_surface.get_width()
-            pg.draw.line(surface, WHITE, (cursor_pos, self.rect.y + 5), (cursor_pos, self.rect.y + self.rect.height - 5), 2)
-
+            cursor_pos = rect.x + 5 + text_surface.get_width()
+            pg.draw.line(surface, WHITE, (cursor_pos, rect.y + 5), (cursor_pos, rect.y + rect.height - 5), 2)
+
+
+SOCKET_DEFS = {}
+
+def shared_socket_defs(defs):
+    """Returns one shared, immutable tuple per distinct socket def list,
+    so Nodes of the same preset (or with the same defs from a save) share them."""
+    key = defs if isinstance(defs, tuple) else tuple(map(tuple, defs))
+    return SOCKET_DEFS.setdefault(key, key)
+
+# Layout-Cache (siehe Node.calculate_size): Socket-Beschriftungen je (Defs, Font),
+# fertige Größen je (Titel, Defs, Font)
+SOCKET_LABEL_WIDTHS = {}
+NODE_SIZES = {}
+NODE_SIZES_MAX = 4096
+
+def socket_label_width(input_defs, output_defs, font):
+    """Width of the widest socket label, measured once per (shared socket defs, font)."""
+    key = (input_defs, output_defs, font)
+    width = SOCKET_LABEL_WIDTHS.get(key)
+    if width is None:
+        width = SOCKET_LABEL_WIDTHS[key] = max(
+            (TEXT_CACHE.size(font, f"{sock_name} ({sock_type})")[0] for sock_name, sock_type in input_defs + output_defs),
+            default=0
+        )
+    return width
 
 class NodePreset:
     """Base class for Node Presets"""
     def __init__(self, name, inputs, outputs):
         self.name = name
-        self.inputs = inputs
-        self.outputs = outputs
+        self.inputs = shared_socket_defs(inputs)
+        self.outputs = shared_socket_defs(outputs)
+        self._size = None
+
+    @property
+    def size(self):
+        """(width, height) of a new Node of this preset, measured only once."""
+        if self._size is None:
+            self._size = Node.calculate_size(self.name, self.inputs, self.outputs)
+        return self._size
 
     def create_node(self, x, y):
         """Returns a Node-Instance."""
-        return Node(self.name, x, y, self.inputs, self.outputs)
+        return Node(self.name, x, y, self.inputs, self.outputs, preset_name=self.name, size=self.size)
     
 class NodeFactory:
     """Configs and provides NodePresets."""
     def __init__(self):
         self.presets = [NodePreset(**nio) for nio in DEFAULT_NODES]
+
+    def create_nodes(self, entries):
+        """Creates many Nodes at once. entries: (preset or preset name, x, y).
+        Returns the Nodes in the same order (add them with NodeEditor.add_nodes)."""
+        by_name = {p.name: p for p in self.presets}
+        nodes = []
+        for preset, x, y in entries:
+            if isinstance(preset, str):
+                preset = by_name[preset]
+            nodes.append(Node(preset.name, x, y, preset.inputs, preset.outputs, preset_name=preset.name, size=preset.size))
+        return nodes
     
     def get_preset_names(self):
         return [p.name for p in self.presets]
@@ -134,8 +192,7 @@ class UIPanel:
         self.button_height = 30
         self.buttons = []
         self._setup_buttons()
-        pg.font.init()
-        self.ui_font = pg.font.SysFont('Consolas',FONT_SIZE_BASE)
+        self.ui_font = NORM_FONT
 
     def _setup_buttons(self):
         y_offset = self.rect.top + 35
@@ -152,51 +209,62 @@ class UIPanel:
                     new_y = (SCREEN_HEIGHT // 2) - self.editor.offset_y
                     preset = self.factory.get_preset_by_name(name)
                     if preset:
-                        self.editor.nodes.append(preset.create_node(new_x / self.editor.scale, new_y / self.editor.scale))
+                        self.editor.add_node(preset.create_node(new_x / self.editor.scale, new_y / self.editor.scale))
                         print(f"Node '{name}' über UI erstellt.")
 
     def draw(self, surface):
         pg.draw.rect(surface, PANEL_COLOR, self.rect)
         
-        title = self.ui_font.render("Knoten erstellen (A)", True, WHITE)
+        title = TEXT_CACHE.render(self.ui_font, "Knoten erstellen (A)", WHITE)
         surface.blit(title, (self.rect.left + 5, self.rect.top + 5))
         pg.draw.line(surface, GRAY, (self.rect.left, self.rect.top + 30), (self.rect.right, self.rect.top + 30), 1)
 
         for name, rect in self.buttons:
             pg.draw.rect(surface, NODE_HEADER_COLOR, rect)
-            text = self.ui_font.render(name, True, WHITE)
+            text = TEXT_CACHE.render(self.ui_font, name, WHITE)
             text_rect = text.get_rect(center=rect.center)
             surface.blit(text, text_rect)
             
 class Socket:
     """Represents the Input- or Output-Connection on the knot."""
+    __slots__ = ("name", "node", "is_input", "index", "data_type")
+    RADIUS = 6
+    radius = RADIUS
+
     def __init__(self, name, node, is_input, index, data_type="any"):
         self.name = name
         self.node = node
         self.is_input = is_input
         self.index = index
-        self.radius = 6
-        self.data_type = data_type.lower() 
+        # lower() nur wenn nötig, damit alle Sockets den String aus den geteilten Defs nutzen
+        self.data_type = data_type if data_type.islower() else data_type.lower()
     def get_color(self) -> Color:
         return DATA_TYPES.get(self.data_type,WHITE)
+    def get_local_pos(self):
+        """Position of the socket relative to the top left of its node (unscaled)."""
+        header_height = 25
+        x = 0 if self.is_input else self.node.width
+        return (x, header_height + (self.index + 0.5) * 20)
+
+    def get_world_pos(self):
+        local_x, local_y = self.get_local_pos()
+        return (self.node.x + local_x, self.node.y + local_y)
+
     def get_pos(self, editor_offset, scale):
         """Calculates the drawing position of the sockets with offset & scaling."""
+        local_x, local_y = self.get_local_pos()
         
-        if self.is_input:
-            x_base = self.node.x
-        else:
-            x_base = self.node.x + self.node.width
-        header_height = 25
-        y_base = self.node.y + header_height + (self.index + 0.5) * 20
-        
-        x = (x_base * scale) + editor_offset[0]
-        y = (y_base * scale) + editor_offset[1]
+        x = ((self.node.x + local_x) * scale) + editor_offset[0]
+        y = ((self.node.y + local_y) * scale) + editor_offset[1]
         
         return (int(x), int(y))
 
     def draw(self, surface, editor_offset, scale, font):
         """Draws the Socket in the color of his datatype and representing form."""
-        pos = self.get_pos(editor_offset, scale)
+        self.draw_at(surface, self.get_pos(editor_offset, scale), scale, font)
+
+    def draw_at(self, surface, pos, scale, font):
+        """Draws the Socket centered on pos (surface coordinates)."""
         color = DATA_TYPES.get(self.data_type, DEFAULT_SOCKET_COLOR)
         
         current_radius = max(2, int(self.radius * scale))
@@ -213,7 +281,7 @@ class Socket:
         if font.get_height() < FONT_MIN_SIZE_DRAW:
             return
 
-        text_surface = font.render(f"{self.name} ({self.data_type})", True, WHITE)
+        text_surface = TEXT_CACHE.render(font, f"{self.name} ({self.data_type})", WHITE)
         
         text_offset = max(5, int((self.radius + 5) * scale))
         
@@ -225,18 +293,26 @@ class Socket:
             
 class Node:
     """Repräsentiert einen Knoten im System."""
+    __slots__ = (
+        "x", "y", "input_defs", "output_defs", "preset_name", "params", "width", "height", "id",
+        "is_dragging", "offset_x", "offset_y", "inputs", "outputs", "title", "_title_input", "is_editing_title",
+        "surface", "_surface_key", "_surface_margin", "dirty"
+    )
     node_counter = 0
     HEADER_HEIGHT = 25
     LINE_HEIGHT = 20
 
-    def __init__(self, name, x, y, input_defs, output_defs, node_id=None):
+    def __init__(self, name, x, y, input_defs, output_defs, node_id=None, preset_name=None, params=None, size=None):
         self.x = x
         self.y = y
-        self.input_defs = input_defs 
-        self.output_defs = output_defs
+        input_defs = self.input_defs = shared_socket_defs(input_defs)
+        output_defs = self.output_defs = shared_socket_defs(output_defs)
+        # Preset bestimmt die Compute-Funktion bei der Auswertung, params die Werte (z.B. Integer.number)
+        self.preset_name = preset_name or name
+        self.params = params if params is not None else {}
         
-        self.width = self._calculate_width(name, input_defs, output_defs)
-        self.height = self.HEADER_HEIGHT + max(len(input_defs), len(output_defs)) * self.LINE_HEIGHT
+        # size: schon bekannte (width, height), z.B. vom Preset
+        self.width, self.height = size or self.calculate_size(name, input_defs, output_defs)
         
         if node_id is None:
             self.id = Node.node_counter
@@ -250,32 +326,77 @@ class Node:
         self.inputs = [Socket(n, self, True, i, t) for i, (n, t) in enumerate(input_defs)]
         self.outputs = [Socket(n, self, False, i, t) for i, (n, t) in enumerate(output_defs)]
         
-        self.title_input = TextInput(
-            pg.Rect(self.x, self.y, self.width, self.HEADER_HEIGHT), 
-            name, 
-            pg.font.SysFont('Consolas',FONT_SIZE_BASE)
-        )
+        self.title = name
+        # Das TextInput entsteht erst, wenn der Titel bearbeitet wird (siehe title_input)
+        self._title_input = None
         self.is_editing_title = False
+        
+        # Each Node owns a pre-rendered blit surface (see module docstring)
+        self.surface = None
+        self._surface_key = None
+        self._surface_margin = 0
+        self.dirty = True
+
+    @classmethod
+    def from_dict(cls, n_data):
+        return cls(
+            name=n_data["title"], 
+            x=n_data["x"], 
+            y=n_data["y"], 
+            input_defs=n_data["input_defs"],
+            output_defs=n_data["output_defs"],
+            node_id=n_data["id"],
+            preset_name=n_data.get("preset"),
+            params=n_data.get("params")
+        )
 
-    def _calculate_width(self, name, input_defs, output_defs):
-        """Berechnet die notwendige Breite des Knotens basierend auf Basis-Fontgröße."""
+    @classmethod
+    def calculate_size(cls, name, input_defs, output_defs):
+        """(width, height) eines Nodes, ohne ihn zu erzeugen. Gemerkt je (Titel, Socket-Defs, Font),
+        Nodes eines Presets (und Stubs beim Laden) werden also nur einmal vermessen."""
+        input_defs = shared_socket_defs(input_defs)
+        output_defs = shared_socket_defs(output_defs)
+        key = (name, input_defs, output_defs, NORM_FONT)
+        size = NODE_SIZES.get(key)
+        if size is None:
+            width = cls._calculate_width(name, input_defs, output_defs)
+            size = (width, cls.HEADER_HEIGHT + max(len(input_defs), len(output_defs)) * cls.LINE_HEIGHT)
+            if len(NODE_SIZES) >= NODE_SIZES_MAX:
+                del NODE_SIZES[next(iter(NODE_SIZES))]
+            NODE_SIZES[key] = size
+        return size
+
+    @staticmethod
+    def _calculate_width(name, input_defs, output_defs):
+        """Berechnet die notwendige Breite des Knotens basierend auf Basis-Fontgröße.
+        Die Socket-Beschriftungen sind je Socket-Defs gemerkt, gemessen wird nur der Titel."""
         padding = 50 
         
-        base_font = pg.font.SysFont('Consolas',FONT_SIZE_BASE)
-        
-        title_width = base_font.render(name, True, WHITE).get_width() + 10 
+        base_font = NORM_FONT
         
-        max_socket_width = 0
-        all_defs = input_defs + output_defs
+        title_width = TEXT_CACHE.size(base_font, name)[0] + 10 
         
-        for sock_name, sock_type in all_defs:
-            text = f"{sock_name} ({sock_type})"
-            max_socket_width = max(max_socket_width, base_font.render(text, True, WHITE).get_width())
+        max_socket_width = socket_label_width(input_defs, output_defs, base_font)
 
         min_content_width = max(title_width, max_socket_width)
         
         return max(150, min_content_width + padding)
 
+    @property
+    def title_input(self):
+        """TextInput for the title; created on first use, dropped by stop_editing."""
+        if self._title_input is None:
+            self._title_input = TextInput(
+                pg.Rect(self.x, self.y, self.width, self.HEADER_HEIGHT), 
+                self.title, 
+                NORM_FONT
+            )
+        return self._title_input
+
+    def stop_editing(self):
+        self.is_editing_title = False
+        self._title_input = None
+
     def get_global_rect(self, editor_offset, scale):
         """Gibt das SKALIERTE Rechteck des Nodes auf dem Bildschirm zurück."""
         return pg.Rect(
@@ -290,36 +411,98 @@ class Node:
         return pg.Rect(self.x, self.y, self.width, self.height)
 
 
-    def draw(self, surface, editor_offset, scale, font):
-        draw_rect = self.get_global_rect(editor_offset, scale)
-        header_rect = pg.Rect(draw_rect.left, draw_rect.top, draw_rect.width, self.HEADER_HEIGHT * scale)
+    def mark_dirty(self):
+        """Forces a rebuild of the cached surface on the next draw."""
+        self.dirty = True
+
+    def release_surface(self):
+        """Frees the cached surface (e.g. when the Node leaves the screen)."""
+        self.surface = None
+        self._surface_key = None
+
+    def _get_surface_key(self, scale, font):
+        return (
+            self.title,
+            self.input_defs,
+            self.output_defs,
+            self.width,
+            round(scale, 3),
+            font.get_height(),
+            self.is_editing_title,
+            self._title_input is not None and self._title_input.active
+        )
+
+    def _render_surface(self, scale, font):
+        """Rendert den Node in seine eigene Surface. Sockets ragen um margin über den Rand."""
+        margin = max(2, int(Socket.RADIUS * scale)) + 1
+        width = int(self.width * scale)
+        height = int(self.height * scale)
+        surface = pg.Surface((width + margin * 2, height + 1), pg.SRCALPHA)
         
-        pg.draw.rect(surface, NODE_COLOR, draw_rect, border_radius=5)
-        pg.draw.rect(surface, NODE_HEADER_COLOR, header_rect, border_top_left_radius=5, border_top_right_radius=5)
+        body_rect = pg.Rect(margin, 0, width, height)
+        header_rect = pg.Rect(margin, 0, width, self.HEADER_HEIGHT * scale)
         
-        self.title_input.font = font
+        pg.draw.rect(surface, NODE_COLOR, body_rect, border_radius=5)
+        pg.draw.rect(surface, NODE_HEADER_COLOR, header_rect, border_top_left_radius=5, border_top_right_radius=5)
         
         if font.get_height() < FONT_MIN_SIZE_DRAW:
             pass
         elif self.is_editing_title:
-            self.title_input.set_rect(header_rect)
-            self.title_input.draw(surface)
+            self.title_input.draw(surface, header_rect)
         else:
-            text_surface = font.render(self.title_input.text, True, WHITE)
+            text_surface = TEXT_CACHE.render(font, self.title, WHITE)
             text_rect = text_surface.get_rect(centerx=header_rect.centerx, centery=header_rect.centery)
             surface.blit(text_surface, text_rect)
         
         for socket in self.inputs + self.outputs:
-            socket.draw(surface, editor_offset, scale, font)
+            local_x, local_y = socket.get_local_pos()
+            socket.draw_at(surface, (margin + int(local_x * scale), int(local_y * scale)), scale, font)
+        
+        self.surface = surface
+        self._surface_margin = margin
 
-    def handle_event(self, event, editor_offset, scale):
+    def draw(self, surface, editor_offset, scale, font):
+        """Blits the cached surface, rebuilding it only if the Node is dirty."""
+        draw_rect = self.get_global_rect(editor_offset, scale)
+        
+        if self.is_editing_title:
+            self.title_input.font = font
+            self.title_input.set_rect(pg.Rect(draw_rect.left, draw_rect.top, draw_rect.width, self.HEADER_HEIGHT * scale))
         
+        key = self._get_surface_key(scale, font)
+        if self.dirty or self.surface is None or key != self._surface_key:
+            PROFILER.count("surfaces rebuilt")
+            self._render_surface(scale, font)
+            self._surface_key = key
+            self.dirty = False
+        
+        surface.blit(self.surface, (draw_rect.left - self._surface_margin, draw_rect.top))
+
+    def draw_lod(self, surface, editor_offset, scale, lod):
+        """Vereinfachte Darstellung für weit herausgezoomte Ansichten (keine Sockets/Texte)."""
+        draw_rect = self.get_global_rect(editor_offset, scale)
+        surface.fill(NODE_COLOR, draw_rect)
+        if lod == LOD_SIMPLE:
+            surface.fill(NODE_HEADER_COLOR, (draw_rect.left, draw_rect.top, draw_rect.width, int(self.HEADER_HEIGHT * scale)))
+
+    def get_world_bounds(self):
+        """(x, y, w, h) in Weltkoordinaten, für den SpatialGrid-Index."""
+        return (self.x, self.y, self.width, self.height)
+
+    def handle_event(self, event, editor_offset, scale):
+        """Returns True if the title or the size of the Node changed."""
+        changed = False
         if self.is_editing_title:
+            self.dirty = True
             self.title_input.rect = self.get_local_rect()
+            old_title = self.title
             self.title_input.handle_event(event)
-            self.width = self._calculate_width(self.title_input.text, self.input_defs, self.output_defs)
+            self.title = self.title_input.text
+            old_width = self.width
+            self.width = self._calculate_width(self.title, self.input_defs, self.output_defs)
+            changed = self.width != old_width or self.title != old_title
             if not self.title_input.active:
-                self.is_editing_title = False
+                self.stop_editing()
         
         if event.type == pg.MOUSEBUTTONDOWN and event.button == 1:
             draw_rect = self.get_global_rect(editor_offset, scale)
@@ -328,6 +511,7 @@ class Node:
             if header_rect.collidepoint(event.pos):
                 self.is_editing_title = True
                 self.title_input.active = True
+        return changed
 
     def get_socket_at_pos(self, pos, editor_offset, scale):
         """Sucht nach Socket-Kollision mit Mausposition (pos ist skaliert)."""
@@ -335,15 +519,14 @@ class Node:
             sock_pos = socket.get_pos(editor_offset, scale)
             current_radius = max(2, int(socket.radius * scale))
             
-            socket_rect = pg.Rect(sock_pos[0] - current_radius, sock_pos[1] - current_radius, 
-                                     current_radius * 2, current_radius * 2)
-            if socket_rect.collidepoint(pos):
+            if (sock_pos[0] - current_radius <= pos[0] < sock_pos[0] + current_radius and
+                    sock_pos[1] - current_radius <= pos[1] < sock_pos[1] + current_radius):
                 return socket
         return None
 
     def start_drag(self, mouse_pos, editor_offset, scale):
         self.is_dragging = True
-        self.is_editing_title = False
+        self.stop_editing()
         
         self.offset_x = self.x - ((mouse_pos[0] - editor_offset[0]) / scale)
         self.offset_y = self.y - ((mouse_pos[1] - editor_offset[1]) / scale)
@@ -352,44 +535,103 @@ class Node:
         self.is_dragging = False
 
     def update(self, mouse_pos, editor_offset, scale):
+        """Returns True if the Node was moved."""
         if self.is_dragging:
-            self.x = ((mouse_pos[0] - editor_offset[0]) / scale) + self.offset_x
-            self.y = ((mouse_pos[1] - editor_offset[1]) / scale) + self.offset_y
+            x = ((mouse_pos[0] - editor_offset[0]) / scale) + self.offset_x
+            y = ((mouse_pos[1] - editor_offset[1]) / scale) + self.offset_y
+            if x != self.x or y != self.y:
+                self.x = x
+                self.y = y
+                return True
+        return False
 
     def to_dict(self):
         return {
             "id": self.id,
-            "title": self.title_input.text,
+            "title": self.title,
             "x": self.x,
             "y": self.y,
             "input_defs": self.input_defs,
-            "output_defs": self.output_defs
+            "output_defs": self.output_defs,
+            "preset": self.preset_name,
+            "params": self.params
         }
 
+class NodeStub:
+    """Platzhalter für einen noch nicht erzeugten Node beim Lazy Loading.
+    Kennt nur Position und Größe, damit er indiziert und im LOD-Modus gezeichnet werden kann."""
+    __slots__ = ("data", "id", "x", "y", "width", "height")
+    HEADER_HEIGHT = Node.HEADER_HEIGHT
+
+    def __init__(self, n_data):
+        self.data = n_data
+        self.id = n_data["id"]
+        self.x = n_data["x"]
+        self.y = n_data["y"]
+        self.width, self.height = Node.calculate_size(n_data["title"], n_data["input_defs"], n_data["output_defs"])
+
+    get_global_rect = Node.get_global_rect
+    get_world_bounds = Node.get_world_bounds
+    draw_lod = Node.draw_lod
+
+    def make_socket(self, name, is_input):
+        """Socket an der Stelle aus den Defs (für Platzhalter-Edges) oder None."""
+        defs = self.data["input_defs" if is_input else "output_defs"]
+        for index, (socket_name, data_type) in enumerate(defs):
+            if socket_name == name:
+                return Socket(name, self, is_input, index, data_type)
+        return None
+
+    def to_dict(self):
+        return self.data
+
 class Edge:
     """Repräsentiert eine Verbindung zwischen zwei Sockets."""
+    __slots__ = ("start_socket", "end_socket", "_curve", "_curve_key")
+    CONTROL_OFFSET = 50
+
     def __init__(self, start_socket, end_socket):
         self.start_socket = start_socket
         self.end_socket = end_socket
+        self._curve = None
+        self._curve_key = None
+
+    def get_control_points(self):
+        """Kontrollpunkte der Bézier-Kurve in Weltkoordinaten."""
+        p1 = self.start_socket.get_world_pos()
+        p4 = self.end_socket.get_world_pos()
+        return [p1, (p1[0] + self.CONTROL_OFFSET, p1[1]), (p4[0] - self.CONTROL_OFFSET, p4[1]), p4]
+
+    def get_world_bounds(self):
+        """Bounding box der Kurve in Weltkoordinaten (die Kurve liegt in der Hülle ihrer Kontrollpunkte)."""
+        x, y, w, h = bounds(self.get_control_points())
+        pad = 3
+        return (x - pad, y - pad, w + pad * 2, h + pad * 2)
+
+    def get_curve(self, scale):
+        """World-space polyline of the curve; only re-tessellated if an endpoint moved
+        or the on-screen length needs a different segment count."""
+        points = self.get_control_points()
+        segments = segments_for_length(estimate_length(points) * scale)
+        key = (points[0], points[3], segments)
+        if key != self._curve_key:
+            PROFILER.count("curves tessellated")
+            self._curve = tessellate(points, segments)
+            self._curve_key = key
+        return self._curve
         
-    def draw(self, surface, editor_offset, scale):
+    def draw(self, surface, editor_offset, scale, lod=LOD_FULL):
         """Zeichnet die Verbindungslinie als Bézier-Kurve mit Skalierung."""
-        start_pos = self.start_socket.get_pos(editor_offset, scale)
-        end_pos = self.end_socket.get_pos(editor_offset, scale)
-        
-        p1 = start_pos
-        p4 = end_pos
+        color = self.start_socket.get_color()
         
-        offset = 50 * scale
-        p2 = (p1[0] + offset, p1[1])
-        p3 = (p4[0] - offset, p4[1])
+        if lod != LOD_FULL:
+            p1 = self.start_socket.get_pos(editor_offset, scale)
+            p4 = self.end_socket.get_pos(editor_offset, scale)
+            pg.draw.line(surface, color, p1, p4, 1)
+            return
         
         line_width = max(1, int(3 * scale))
-        
-        try:
-            draw_beziere(surface,[p1, p2, p3, p4], color=self.start_socket.get_color(),width = line_width)
-        except AttributeError:
-             pg.draw.line(surface, WHITE, p1, p4, line_width)
+        pg.draw.lines(surface, color, False, transform(self.get_curve(scale), editor_offset, scale), line_width)
 
     def to_dict(self):
         return {
@@ -399,14 +641,125 @@ class Edge:
             "end_socket_name": self.end_socket.name
         }
     
+class EventDispatcher:
+    """Routes pygame events only to the Nodes that need them instead of broadcasting:
+    mouse clicks to the Node under the cursor, keys to the Node whose title has the
+    focus. Dragged Nodes stay captured until the mouse button is released."""
+    KEY_EVENTS = (pg.KEYDOWN, pg.KEYUP, pg.TEXTINPUT)
+
+    def __init__(self, editor):
+        self.editor = editor
+        self.focus = None
+        self.captured = []
+        # Position beim Start des Ziehens, ein Undo-Eintrag pro Drag
+        self.drag_origins = {}
+
+    def reset(self):
+        self.focus = None
+        self.captured.clear()
+        self.drag_origins.clear()
+
+    def release(self, node):
+        """Forgets a removed Node."""
+        if self.focus is node:
+            self.focus = None
+        if node in self.captured:
+            self.captured.remove(node)
+        self.drag_origins.pop(node, None)
+
+    def _deliver(self, node, event):
+        editor = self.editor
+        old_title = node.title
+        if node.handle_event(event, (editor.offset_x, editor.offset_y), editor.scale):
+            editor.update_node_index(node)
+        else:
+            # Cursor/Fokus des Titels kann sich geändert haben
+            editor.damage_node(node)
+        # Alle Tastendrücke einer Titelbearbeitung ergeben einen Undo-Eintrag
+        if node.title != old_title:
+            editor.history.record(Rename(node, old_title, node.title, node.is_editing_title))
+        elif not node.is_editing_title:
+            editor.history.seal()
+
+    def dispatch(self, event):
+        """Returns True if the event was consumed by the focused Node (typing)."""
+        focus = self.focus
+        if event.type in self.KEY_EVENTS:
+            if focus is None:
+                return False
+            self._deliver(focus, event)
+            if not focus.is_editing_title:
+                self.focus = None
+            return True
+
+        if event.type == pg.MOUSEBUTTONDOWN:
+            # Der fokussierte Node muss Klicks sehen, um den Fokus zu verlieren
+            if focus is not None:
+                self._deliver(focus, event)
+            target = self.editor.get_node_at_pos(event.pos)
+            if target is not None and target is not focus:
+                self._deliver(target, event)
+                if target.is_editing_title:
+                    if focus is not None and focus.is_editing_title:
+                        focus.stop_editing()
+                    self.focus = focus = target
+            if focus is not None and not focus.is_editing_title:
+                self.focus = None
+        return False
+
+    def start_drag(self, node, mouse_pos):
+        editor = self.editor
+        node.start_drag(mouse_pos, (editor.offset_x, editor.offset_y), editor.scale)
+        editor.damage_node(node)
+        if self.focus is node:
+            self.focus = None
+        self.captured.append(node)
+        self.drag_origins[node] = (node.x, node.y)
+
+    def stop_drag(self):
+        moves = []
+        for node in self.captured:
+            node.stop_drag()
+            origin = self.drag_origins.get(node)
+            if origin is not None and origin != (node.x, node.y):
+                moves.append((node, origin, (node.x, node.y)))
+        self.captured.clear()
+        self.drag_origins.clear()
+        if moves:
+            self.editor.history.record(MoveNodes(moves))
+
+    def update(self, mouse_pos):
+        """Moves the dragged Nodes (once per frame)."""
+        editor = self.editor
+        editor_offset = (editor.offset_x, editor.offset_y)
+        for node in self.captured:
+            if node.update(mouse_pos, editor_offset, editor.scale):
+                editor.update_node_index(node)
+
 class NodeEditor:
     def __init__(self):
         self.factory = NodeFactory()
         
-        self.nodes = []
-        self.edges = []
+        self.graph = GraphStore()
+        # Lazy Loading: noch nicht erzeugte Nodes und Edges (siehe load_state)
+        self.stubs = {}
+        self.pending_edges = {}
+        # Platzhalter-Edges zwischen Stubs: nur indiziert und gezeichnet, nicht im Graph
+        self.placeholder_edges = {}
+        self.node_index = SpatialGrid()
+        self.edge_index = SpatialGrid()
+        # Vektorisierte Geometrie für die LOD-Darstellung (optional, braucht numpy)
+        self.arrays = NodeArrays(Node.HEADER_HEIGHT, Node.LINE_HEIGHT) if USE_NODE_ARRAYS and HAS_NUMPY else None
+        self.plan = None
+        self.evaluator = IncrementalEvaluator()
+        self.autosaver = AutoSaver(SAVE_FILE, AUTOSAVE_INTERVAL, AUTOSAVE_COMPACT_EVERY)
+        self.events = EventDispatcher(self)
+        self.history = History(HISTORY_MAX_BYTES)
+        # Bereiche, die beim nächsten Frame neu gezeichnet werden müssen (DIRTY_RECT_RENDERING)
+        self.damage = DirtyRegions((0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
         self.current_drag_socket = None
         self.drag_start_pos = None
+        self._preview_rect = None
         
         self.offset_x = 0
         self.offset_y = 0
@@ -415,19 +768,78 @@ class NodeEditor:
         
         self.ui_panel = UIPanel(self.factory, pg.Rect(0, 0, 200, SCREEN_HEIGHT), self)
         
-        self.editor_font = pg.font.SysFont('Consolas',FONT_SIZE_BASE)
+        self.editor_font = FONTS.get_for_scale(self.scale)
+        self.cached_nodes = set()
+        self.lod_simple_scale = LOD_SIMPLE_SCALE
+        self.lod_minimal_scale = LOD_MINIMAL_SCALE
         
         if not self.load_state():
             start_preset = self.factory.get_preset_by_name("Start Node - Long Name")
             second_preset = self.factory.get_preset_by_name("Type Converter")
             
+            self.clear()
             if start_preset and second_preset:
-                self.nodes = [
-                    start_preset.create_node(250, 100),
-                    second_preset.create_node(550, 100)
-                ]
-            else:
-                 self.nodes = []
+                self.add_node(start_preset.create_node(250, 100), record=False)
+                self.add_node(second_preset.create_node(550, 100), record=False)
+
+    @property
+    def nodes(self):
+        """Alle erzeugten Nodes in Einfügereihenfolge. Nach Lazy Loading ist das die
+        Reihenfolge des Erzeugens, die Zeichenreihenfolge steht in node_index.z."""
+        return self.graph.nodes.values()
+
+    @property
+    def edges(self):
+        return self.graph.edges.values()
+
+    def clear(self):
+        self.events.reset()
+        self.history.clear()
+        self.damage.invalidate()
+        self.graph.clear()
+        self.stubs.clear()
+        self.pending_edges.clear()
+        self.placeholder_edges.clear()
+        self.node_index.clear()
+        self.edge_index.clear()
+        if self.arrays is not None:
+            self.arrays.clear()
+        self.plan = None
+        self.evaluator.reset()
+
+    def get_plan(self):
+        """Kompiliert den Ausführungsplan nur nach Änderungen an Nodes/Edges neu."""
+        if self.plan is None:
+            self.materialize_all()
+            self.plan = ExecutionPlan.compile(self.nodes, self.edges)
+            self.evaluator.set_plan(self.plan)
+        return self.plan
+
+    def evaluate(self):
+        """Führt den Graphen inkrementell aus (nur geänderte Nodes und ihr Downstream).
+        Returns {node id: {output name: value}} or None on cycles."""
+        try:
+            self.get_plan()
+            results = self.evaluator.run()
+        except (CycleError, EvaluationError) as e:
+            print(f"❌ Auswertung nicht möglich: {e}")
+            return None
+        print(f"✅ Graph ausgewertet ({self.evaluator.executed} von {len(self.plan)} Nodes berechnet).")
+        return results
+
+    def set_node_param(self, node, name, value):
+        """Ändert einen Wert eines Nodes und markiert ihn für die Auswertung als dirty."""
+        node.params[name] = value
+        self.evaluator.mark_dirty(node.id)
+        self.autosaver.node_changed(node)
+
+    def get_lod(self):
+        """Detailstufe für die aktuelle Zoomstufe."""
+        if self.scale < self.lod_minimal_scale:
+            return LOD_MINIMAL
+        if self.scale < self.lod_simple_scale:
+            return LOD_SIMPLE
+        return LOD_FULL
 
     def set_scale(self, new_scale, zoom_center_pos):
         """Ändert den Zoom-Faktor und korrigiert den Offset."""
@@ -440,7 +852,17 @@ class NodeEditor:
         self.offset_x = zoom_center_pos[0] - (world_x * self.scale)
         self.offset_y = zoom_center_pos[1] - (world_y * self.scale)
         
-        self.editor_font = pg.font.Font(FONT_NAME, max(2, int(FONT_SIZE_BASE * self.scale)))
+        self.editor_font = FONTS.get_for_scale(self.scale)
+        self.damage.invalidate()
+        self.autosaver.mark_view_changed()
+
+    def get_view_state(self):
+        return {
+            "editor_offset_x": self.offset_x,
+            "editor_offset_y": self.offset_y,
+            "scale": self.scale,
+            "next_node_id": Node.node_counter
+        }
 
     def are_types_compatible(self, type1, type2):
         """Methode zur Prüfung der Typenkompatibilität (fehlt in der vorigen Antwort, daher hier hinzugefügt, um die Vollständigkeit zu gewährleisten)."""
@@ -467,29 +889,310 @@ class NodeEditor:
             print(f"❌ Verbindung ABGELEHNT: Typen inkompatibel ({out_sock.data_type} -> {in_sock.data_type}).")
             return
             
-        existing_edge = next((
-            edge for edge in self.edges 
-            if edge.start_socket == out_sock and edge.end_socket == in_sock
-        ), None)
+        existing_edge = self.graph.find_edge(out_sock, in_sock)
 
         if existing_edge:
-            self.edges.remove(existing_edge)
-            print(f"Verbindung zwischen '{out_sock.node.title_input.text}.{out_sock.name}' und '{in_sock.node.title_input.text}.{in_sock.name}' GETRENNT.")
+            self.remove_edge(existing_edge)
+            self.history.record(ToggleEdge(existing_edge, False))
+            print(f"Verbindung zwischen '{out_sock.node.title}.{out_sock.name}' und '{in_sock.node.title}.{in_sock.name}' GETRENNT.")
             return
 
         new_edge = Edge(out_sock, in_sock)
-        self.edges.append(new_edge)
-        print(f"Neue Verbindung zwischen '{out_sock.node.title_input.text}.{out_sock.name}' und '{in_sock.node.title_input.text}.{in_sock.name}' HERGESTELLT ({out_sock.data_type} Type).")
-
+        self.add_edge(new_edge)
+        self.history.record(ToggleEdge(new_edge, True))
+        print(f"Neue Verbindung zwischen '{out_sock.node.title}.{out_sock.name}' und '{in_sock.node.title}.{in_sock.name}' HERGESTELLT ({out_sock.data_type} Type).")
+
+
+    def add_node(self, node, record=True):
+        """Fügt einen Node oberhalb aller anderen hinzu und indiziert ihn.
+        record=False: nicht in den Undo-Verlauf (z.B. beim Laden)."""
+        self.graph.add_node(node)
+        self.node_index.insert(node, node.get_world_bounds())
+        if self.arrays is not None:
+            self.arrays.set_node(node, self.node_index.z[node])
+        self.damage_node(node)
+        self.plan = None
+        self.evaluator.mark_dirty(node.id)
+        self.autosaver.node_changed(node)
+        if record:
+            self.history.record(AddNodes((node,)))
+        return node
+
+    def add_nodes(self, nodes, connections=(), record=True):
+        """Adds a whole block of Nodes (paste, import, generated graphs) and connects them.
+        connections: (start node, output name, end node, input name); unknown sockets
+        and incompatible types are skipped. Plan and redraw are invalidated only once.
+        Returns the new Edges."""
+        graph = self.graph
+        node_index = self.node_index
+        arrays = self.arrays
+        for node in nodes:
+            graph.add_node(node)
+            node_index.insert(node, node.get_world_bounds())
+            if arrays is not None:
+                arrays.set_node(node, node_index.z[node])
+            self.evaluator.mark_dirty(node.id)
+            self.autosaver.node_changed(node)
+
+        edges = []
+        for start_node, output_name, end_node, input_name in connections:
+            out_sock = graph.get_socket(start_node.id, output_name, False)
+            in_sock = graph.get_socket(end_node.id, input_name, True)
+            if not (out_sock and in_sock) or graph.find_edge(out_sock, in_sock):
+                continue
+            if not self.are_types_compatible(out_sock.data_type, in_sock.data_type):
+                continue
+            edge = Edge(out_sock, in_sock)
+            graph.add_edge(edge)
+            self.edge_index.insert(edge, edge.get_world_bounds())
+            if arrays is not None:
+                arrays.set_edge(edge, start_node, out_sock.index, end_node, in_sock.index, self.edge_index.z[edge], out_sock.get_color())
+            self.evaluator.mark_dirty(end_node.id)
+            self.autosaver.edge_added(edge)
+            edges.append(edge)
+
+        self.plan = None
+        self.damage.invalidate()
+        if record:
+            self.history.record(AddNodes(nodes, edges))
+        return edges
+
+    def add_block(self, entries, connections=()):
+        """Creates and adds a block of Nodes in one pass. entries: (preset or preset name, x, y),
+        connections: (start index, output name, end index, input name) into entries.
+        Returns (nodes, edges)."""
+        # Nur neue, lebende Objekte: die zyklische GC würde sie bei jedem Schwellwert erneut durchsuchen
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            nodes = self.factory.create_nodes(entries)
+            edges = self.add_nodes(nodes, [(nodes[i], output_name, nodes[j], input_name) for i, output_name, j, input_name in connections])
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return nodes, edges
+
+    def update_node_index(self, node):
+        """Must be called after a Node was moved, resized or renamed."""
+        # Alte und neue Position neu zeichnen
+        self.damage_node(node)
+        self.node_index.update(node, node.get_world_bounds())
+        self.damage_node(node)
+        if self.arrays is not None:
+            self.arrays.set_node(node)
+        self.autosaver.node_changed(node)
+        for edge in self.graph.edges_of(node):
+            self.update_edge_index(edge)
+        for key in self.pending_edges.get(node.id, ()):
+            placeholder = self.placeholder_edges.get(key)
+            if placeholder is not None:
+                self.update_edge_index(placeholder)
+
+    def update_edge_index(self, edge):
+        self.damage_world(self.edge_index.bounds[edge])
+        bounds = edge.get_world_bounds()
+        self.edge_index.update(edge, bounds)
+        self.damage_world(bounds)
+
+    def add_edge(self, edge, track=True, placeholder=None):
+        """track=False for edges that are already part of the save (loading).
+        placeholder: Platzhalter-Edge, deren Platz in der Zeichenreihenfolge die Edge übernimmt."""
+        self.graph.add_edge(edge)
+        if placeholder is not None:
+            self.edge_index.replace(placeholder, edge)
+            self.edge_index.update(edge, edge.get_world_bounds())
+            if self.arrays is not None:
+                self.arrays.remove_edge(placeholder)
+        else:
+            self.edge_index.insert(edge, edge.get_world_bounds())
+        self.damage_world(self.edge_index.bounds[edge])
+        if self.arrays is not None:
+            start, end = edge.start_socket, edge.end_socket
+            self.arrays.set_edge(edge, start.node, start.index, end.node, end.index, self.edge_index.z[edge], start.get_color())
+        self.plan = None
+        self.evaluator.mark_dirty(edge.end_socket.node.id)
+        if track:
+            self.autosaver.edge_added(edge)
+        return edge
+
+    def remove_edge(self, edge):
+        self.graph.remove_edge(edge)
+        self.damage_world(self.edge_index.bounds[edge])
+        self.edge_index.remove(edge)
+        if self.arrays is not None:
+            self.arrays.remove_edge(edge)
+        self.plan = None
+        self.evaluator.mark_dirty(edge.end_socket.node.id)
+        self.autosaver.edge_removed(edge)
+
+    def add_stub(self, stub):
+        self.stubs[stub.id] = stub
+        self.node_index.insert(stub, stub.get_world_bounds())
+        if self.arrays is not None:
+            self.arrays.set_node(stub, self.node_index.z[stub])
+        Node.node_counter = max(Node.node_counter, stub.id + 1)
+
+    def add_pending_edge(self, e_data):
+        """Merkt sich eine Edge zwischen Stubs. Damit sie schon vor dem Erzeugen
+        gezeichnet wird (LOD, lange Edges), kommt ein Platzhalter in edge_index/arrays."""
+        key = (e_data["start_node_id"], e_data["start_socket_name"], e_data["end_node_id"], e_data["end_socket_name"])
+        self.pending_edges.setdefault(key[0], set()).add(key)
+        self.pending_edges.setdefault(key[2], set()).add(key)
+        start, end = self.stubs.get(key[0]), self.stubs.get(key[2])
+        if start is None or end is None:
+            return
+        start_socket = start.make_socket(key[1], False)
+        end_socket = end.make_socket(key[3], True)
+        if start_socket is None or end_socket is None:
+            return
+        placeholder = self.placeholder_edges[key] = Edge(start_socket, end_socket)
+        self.edge_index.insert(placeholder, placeholder.get_world_bounds())
+        if self.arrays is not None:
+            self.arrays.set_edge(placeholder, start, start_socket.index, end, end_socket.index, self.edge_index.z[placeholder], start_socket.get_color())
+
+    def remove_placeholder_edge(self, placeholder):
+        self.damage_world(self.edge_index.bounds[placeholder])
+        self.edge_index.remove(placeholder)
+        if self.arrays is not None:
+            self.arrays.remove_edge(placeholder)
+
+    def materialize(self, node_id):
+        """Erzeugt den Node zu einem Stub (falls nötig). Returns the Node."""
+        stub = self.stubs.pop(node_id, None)
+        if stub is None:
+            return self.graph.get_node(node_id)
+        node = Node.from_dict(stub.data)
+        self.graph.add_node(node)
+        self.node_index.replace(stub, node)
+        self.node_index.update(node, node.get_world_bounds())
+        if self.arrays is not None:
+            self.arrays.replace_node(stub, node)
+        # Platzhalter hängen jetzt am echten Node
+        for key in self.pending_edges.get(node_id, ()):
+            placeholder = self.placeholder_edges.get(key)
+            if placeholder is not None:
+                socket = placeholder.start_socket if key[0] == node_id else placeholder.end_socket
+                socket.node = node
+                self.edge_index.update(placeholder, placeholder.get_world_bounds())
+        self.plan = None
+        self.evaluator.mark_dirty(node.id)
+        return node
+
+    def ensure_edges(self, node):
+        """Erzeugt die noch ausstehenden Edges eines Nodes (und dafür seine Nachbarn)."""
+        keys = self.pending_edges.pop(node.id, None)
+        if not keys:
+            return
+        for key in keys:
+            placeholder = self.placeholder_edges.pop(key, None)
+            other_id = key[2] if key[0] == node.id else key[0]
+            other_keys = self.pending_edges.get(other_id)
+            if other_keys is not None:
+                other_keys.discard(key)
+                if not other_keys:
+                    del self.pending_edges[other_id]
+            self.materialize(other_id)
+            start_socket = self.graph.get_socket(key[0], key[1], False)
+            end_socket = self.graph.get_socket(key[2], key[3], True)
+            if start_socket and end_socket and not self.graph.find_edge(start_socket, end_socket):
+                self.add_edge(Edge(start_socket, end_socket), track=False, placeholder=placeholder)
+            elif placeholder is not None:
+                self.remove_placeholder_edge(placeholder)
+
+    def touch(self, item):
+        """Node (oder Stub) wird benutzt: vollständig erzeugen inkl. Edges."""
+        node = self.materialize(item.id) if isinstance(item, NodeStub) else item
+        self.ensure_edges(node)
+        return node
+
+    def materialize_all(self):
+        for node_id in list(self.stubs):
+            self.materialize(node_id)
+        for node_id in list(self.pending_edges):
+            node = self.graph.get_node(node_id)
+            if node is not None:
+                self.ensure_edges(node)
+
+    def screen_to_world(self, pos):
+        return ((pos[0] - self.offset_x) / self.scale, (pos[1] - self.offset_y) / self.scale)
+
+    # --- Dirty Rects ---
+    def damage_world(self, bounds):
+        """Marks a world-space (x, y, w, h) area, plus the socket overhang, for redrawing."""
+        x, y, w, h = bounds
+        pad = max(2, int(Socket.RADIUS * self.scale)) + 3
+        self.damage.add((
+            int(x * self.scale + self.offset_x) - pad,
+            int(y * self.scale + self.offset_y) - pad,
+            int(w * self.scale) + pad * 2 + 1,
+            int(h * self.scale) + pad * 2 + 1
+        ))
+
+    def damage_node(self, node):
+        bounds = self.node_index.bounds.get(node)
+        if bounds is not None:
+            self.damage_world(bounds)
+
+    def get_drag_preview_points(self, mouse_pos):
+        """Bézier-Kontrollpunkte der Vorschau-Linie beim Ziehen einer Verbindung (oder None)."""
+        if not (self.current_drag_socket and self.drag_start_pos):
+            return None
+        p1 = self.drag_start_pos
+        offset = 50 * self.scale
+        dir_mult = -1 if self.current_drag_socket.is_input else 1
+        return [p1, (p1[0] + offset * dir_mult, p1[1]), (mouse_pos[0] - offset, mouse_pos[1]), mouse_pos]
+
+    def damage_drag_preview(self, mouse_pos):
+        """Alte und neue Vorschau-Linie neu zeichnen (einmal pro Frame)."""
+        if self._preview_rect is not None:
+            self.damage.add(self._preview_rect)
+            self._preview_rect = None
+        points = self.get_drag_preview_points(mouse_pos)
+        if points is not None:
+            x, y, w, h = bounds(points)
+            pad = max(1, int(3 * self.scale)) + 2
+            self._preview_rect = pg.Rect(int(x) - pad, int(y) - pad, int(w) + pad * 2 + 1, int(h) + pad * 2 + 1)
+            self.damage.add(self._preview_rect)
+
+    def is_animating(self):
+        """True while the picture changes without new events (drag, pan, pending redraws)."""
+        return bool(self.damage) or self.is_panning or self.current_drag_socket is not None or bool(self.events.captured)
+
+    def get_node_at_pos(self, pos, skip_editing=False):
+        """Sucht den obersten Node an der Mausposition über den SpatialGrid-Index."""
+        editor_offset = (self.offset_x, self.offset_y)
+        world_x, world_y = self.screen_to_world(pos)
+        for node in self.node_index.query_point(world_x, world_y, 1 / self.scale):
+            node = self.touch(node)
+            if skip_editing and node.is_editing_title:
+                continue
+            if node.get_global_rect(editor_offset, self.scale).collidepoint(pos):
+                return node
+        return None
 
     def get_socket_at_pos_global(self, pos):
         """Sucht nach einem Socket an der Mausposition (pos ist skaliert/verschoben)."""
-        for node in reversed(self.nodes):
-            socket = node.get_socket_at_pos(pos, (self.offset_x, self.offset_y), self.scale)
+        editor_offset = (self.offset_x, self.offset_y)
+        world_x, world_y = self.screen_to_world(pos)
+        # Sockets ragen um ihren Radius über den Node hinaus
+        margin = (max(2, int(Socket.RADIUS * self.scale)) + 1) / self.scale
+        for node in self.node_index.query_point(world_x, world_y, margin):
+            node = self.touch(node)
+            socket = node.get_socket_at_pos(pos, editor_offset, self.scale)
             if socket:
                 return socket
         return None
 
+    def get_viewport_world_rect(self, area=None):
+        """Sichtbarer Bereich (oder area, ein Bildschirm-Rect) inkl. CULL_PADDING als (x, y, w, h) in Weltkoordinaten."""
+        x, y, w, h = area or (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        return (
+            (x - CULL_PADDING - self.offset_x) / self.scale,
+            (y - CULL_PADDING - self.offset_y) / self.scale,
+            (w + 2 * CULL_PADDING) / self.scale,
+            (h + 2 * CULL_PADDING) / self.scale
+        )
+
     def is_node_visible(self, node):
         """Prüft, ob der Node (oder Teile davon) auf dem Bildschirm sichtbar ist, mit Puffer."""
         rect = node.get_global_rect((self.offset_x, self.offset_y), self.scale)
@@ -500,140 +1203,252 @@ class NodeEditor:
         
         return rect.colliderect(visible_rect)
 
-    def remove_node(self, node_to_remove):
+    def remove_node(self, node_to_remove, record=True):
         """Entfernt einen Node und alle damit verbundenen Edges."""
         
-        self.edges = [
-            edge for edge in self.edges 
-            if edge.start_socket.node != node_to_remove and edge.end_socket.node != node_to_remove
-        ]
-        
-        if node_to_remove in self.nodes:
-            self.nodes.remove(node_to_remove)
-            print(f"Node '{node_to_remove.title_input.text}' (ID: {node_to_remove.id}) entfernt.")
+        if self.graph.has_node(node_to_remove):
+            self.ensure_edges(node_to_remove)
+            removed_edges = self.graph.remove_node(node_to_remove)
+            for edge in removed_edges:
+                self.damage_world(self.edge_index.bounds[edge])
+                self.edge_index.remove(edge)
+                if self.arrays is not None:
+                    self.arrays.remove_edge(edge)
+                self.evaluator.mark_dirty(edge.end_socket.node.id)
+                self.autosaver.edge_removed(edge)
+            self.damage_node(node_to_remove)
+            self.node_index.remove(node_to_remove)
+            self.events.release(node_to_remove)
+            if self.arrays is not None:
+                self.arrays.remove_node(node_to_remove)
+            self.autosaver.node_removed(node_to_remove.id)
+            self.evaluator.forget(node_to_remove.id)
+            self.plan = None
+            if record:
+                self.history.record(RemoveNodes((node_to_remove,), removed_edges))
+            print(f"Node '{node_to_remove.title}' (ID: {node_to_remove.id}) entfernt.")
             return True
         return False
 
 
-    def save_state(self):
+    def set_node_title(self, node, title):
+        """Renames a Node (used by undo/redo); ends a running title edit."""
+        self.events.release(node)
+        node.stop_editing()
+        node.title = title
+        node.width = node._calculate_width(title, node.input_defs, node.output_defs)
+        node.mark_dirty()
+        self.update_node_index(node)
+
+    def undo(self):
+        """Nimmt die letzte Änderung zurück. Returns False if there was none."""
+        return self.history.undo(self)
+
+    def redo(self):
+        return self.history.redo(self)
+
+    def memory_report(self):
+        """Speicherbedarf des geladenen Graphen je Kategorie (siehe src/memory.py)."""
+        nodes = list(self.nodes)
+        placeholders = list(self.placeholder_edges.values())
+        return memory_report({
+            "surfaces": [node.surface for node in nodes if node.surface is not None],
+            "nodes": nodes,
+            "sockets": [socket for node in nodes for socket in node.inputs + node.outputs],
+            "edges": list(self.edges),
+            "stubs": list(self.stubs.values()) + placeholders + [s for edge in placeholders for s in (edge.start_socket, edge.end_socket)],
+            "indexes": [self.graph, self.node_index, self.edge_index, self.arrays, self.pending_edges]
+        }, owned_elsewhere=(Node, Socket, Edge, NodeStub))
+
+    def save_state(self, path=SAVE_FILE):
+        """Speichert als JSON oder im Binärformat (Dateiendung .ngb, siehe src/binary_save.py)."""
+        # In Zeichenreihenfolge speichern, damit nach dem Laden derselbe Node oben liegt
+        nodes = list(self.nodes)
+        nodes += self.stubs.values()
+        nodes.sort(key=self.node_index.z.__getitem__)
+        edges = [edge.to_dict() for edge in self.edges]
+        if self.pending_edges:
+            # Nicht erzeugte Edges direkt aus den geladenen Daten übernehmen
+            pending = set().union(*self.pending_edges.values())
+            edges += [{
+                "start_node_id": key[0],
+                "start_socket_name": key[1],
+                "end_node_id": key[2],
+                "end_socket_name": key[3]
+            } for key in pending]
         data = {
-            "nodes": [node.to_dict() for node in self.nodes],
-            "edges": [edge.to_dict() for edge in self.edges],
-            "editor_offset_x": self.offset_x,
-            "editor_offset_y": self.offset_y,
-            "scale": self.scale,
-            "next_node_id": Node.node_counter 
+            "nodes": [node.to_dict() for node in nodes],
+            "edges": edges,
+            **self.get_view_state()
         }
         try:
-            with open(SAVE_FILE, 'w') as f:
-                json.dump(data, f, indent=4)
-            print(f"\n✅ Zustand erfolgreich in '{SAVE_FILE}' gespeichert. (S-Taste)")
+            write_save(path, data)
+            print(f"\n✅ Zustand erfolgreich in '{path}' gespeichert. (S-Taste)")
             return True
         except Exception as e:
             print(f"\n❌ Fehler beim Speichern: {e}")
             return False
 
-    def load_state(self):
-        if not os.path.exists(SAVE_FILE):
+    def load_state(self, path=SAVE_FILE, lazy=None):
+        """Lädt JSON- oder Binär-Saves. Mit lazy (Standard: ab LAZY_LOAD_MIN_NODES Nodes)
+        werden zunächst nur Positionen indiziert; Nodes und Edges entstehen erst,
+        wenn sie sichtbar werden, angeklickt oder ausgewertet werden."""
+        if not os.path.exists(path):
             return False
             
         try:
-            with open(SAVE_FILE, 'r') as f:
-                data = json.load(f)
-
-            self.nodes = []
-            self.edges = []
+            # Noch nicht übernommene Autosave-Änderungen zuerst einspielen
+            self.autosaver.wait()
+            compact_journal(path, path + JOURNAL_SUFFIX)
+            data, node_records, edge_records = stream_save(path)
+            if lazy is None:
+                lazy = data["node_count"] >= LAZY_LOAD_MIN_NODES
+
+            self.clear()
             Node.node_counter = data.get("next_node_id", 0)
 
-            loaded_nodes = {}
-            for n_data in data["nodes"]:
-                new_node = Node(
-                    name=n_data["title"], 
-                    x=n_data["x"], 
-                    y=n_data["y"], 
-                    input_defs=n_data["input_defs"],
-                    output_defs=n_data["output_defs"],
-                    node_id=n_data["id"]
-                )
-                self.nodes.append(new_node)
-                loaded_nodes[new_node.id] = new_node
+            for n_data in node_records:
+                if lazy:
+                    self.add_stub(NodeStub(n_data))
+                else:
+                    self.add_node(Node.from_dict(n_data), record=False)
             
-            for e_data in data["edges"]:
-                start_node = loaded_nodes.get(e_data["start_node_id"])
-                end_node = loaded_nodes.get(e_data["end_node_id"])
+            for e_data in edge_records:
+                if lazy:
+                    self.add_pending_edge(e_data)
+                    continue
+                start_socket = self.graph.get_socket(e_data["start_node_id"], e_data["start_socket_name"], False)
+                end_socket = self.graph.get_socket(e_data["end_node_id"], e_data["end_socket_name"], True)
                 
-                if start_node and end_node:
-                    start_socket = next((s for s in start_node.outputs if s.name == e_data["start_socket_name"]), None)
-                    end_socket = next((s for s in end_node.inputs if s.name == e_data["end_socket_name"]), None)
-                    
-                    if start_socket and end_socket:
-                        self.edges.append(Edge(start_socket, end_socket))
+                if start_socket and end_socket:
+                    self.add_edge(Edge(start_socket, end_socket), track=False)
 
             self.offset_x = data.get("editor_offset_x", 0)
             self.offset_y = data.get("editor_offset_y", 0)
             
             self.scale = data.get("scale", 1.0)
-            self.editor_font = pg.font.Font(FONT_NAME, max(2, int(FONT_SIZE_BASE * self.scale)))
+            self.editor_font = FONTS.get_for_scale(self.scale)
+            # Weitere Änderungen landen im Journal der geladenen Datei
+            self.autosaver.retarget(path)
             
-            print(f"\n✅ Zustand erfolgreich aus '{SAVE_FILE}' geladen. (L-Taste)")
+            print(f"\n✅ Zustand erfolgreich aus '{path}' geladen. (L-Taste)")
             return True
 
         except Exception as e:
             print(f"\n❌ Fehler beim Laden der Datei: {e}")
             return False
             
-    def draw(self, surface):
-        
-        visible_nodes = [node for node in self.nodes if self.is_node_visible(node)]
-        
-        for edge in self.edges:
-            start_node_visible = self.is_node_visible(edge.start_socket.node)
-            end_node_visible = self.is_node_visible(edge.end_socket.node)
+    def draw(self, surface, area=None):
+        """Draws the editor; with area (a screen rect) only what overlaps it. Outside of area
+        the result is undefined, the caller copies just area to the screen."""
+        editor_offset = (self.offset_x, self.offset_y)
+        lod = self.get_lod()
+        partial = area is not None and area != (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        if lod != LOD_FULL and self.arrays is not None:
+            self.draw_arrays(surface, editor_offset, lod, area)
+            visible_set = set()
+        else:
+            # Sichtbarkeit einmal pro Frame über die Indizes (Edges über ihre Bounding Box)
+            viewport = self.get_viewport_world_rect(area)
+            visible_nodes = sorted(self.node_index.query_rect(*viewport), key=self.node_index.z.__getitem__)
+            if lod == LOD_FULL and (self.stubs or self.pending_edges):
+                visible_nodes = [self.touch(node) for node in visible_nodes]
+            visible_edges = sorted(self.edge_index.query_rect(*viewport), key=self.edge_index.z.__getitem__)
+            PROFILER.count("edges drawn", len(visible_edges))
+            PROFILER.count("nodes drawn", len(visible_nodes))
             
-            if start_node_visible or end_node_visible:
-                edge.draw(surface, (self.offset_x, self.offset_y), self.scale)
-
-        for node in visible_nodes:
-            node.draw(surface, (self.offset_x, self.offset_y), self.scale, self.editor_font)
+            with PROFILER.scope("edges"):
+                for edge in visible_edges:
+                    edge.draw(surface, editor_offset, self.scale, lod)
+
+            with PROFILER.scope("nodes"):
+                if lod == LOD_FULL:
+                    for node in visible_nodes:
+                        node.draw(surface, editor_offset, self.scale, self.editor_font)
+                    visible_set = set(visible_nodes)
+                else:
+                    for node in visible_nodes:
+                        node.draw_lod(surface, editor_offset, self.scale, lod)
+                    visible_set = set()
         
-        if self.current_drag_socket and self.drag_start_pos:
-            p1 = self.drag_start_pos
-            p4 = pg.mouse.get_pos()
-            offset = 50 * self.scale
-            dir_mult = -1 if self.current_drag_socket.is_input else 1
-            
+        # Surfaces von Nodes außerhalb des Bildschirms (oder im LOD-Modus) freigeben;
+        # ein Teilbereich sagt nichts darüber aus, was sonst noch sichtbar ist
+        if partial:
+            self.cached_nodes |= visible_set
+        else:
+            for node in self.cached_nodes - visible_set:
+                node.release_surface()
+            self.cached_nodes = visible_set
+        
+        points = self.get_drag_preview_points(pg.mouse.get_pos())
+        if points is not None:
             drag_color = DATA_TYPES.get(self.current_drag_socket.data_type, WHITE)
-            
-            p2 = (p1[0] + offset * dir_mult, p1[1])
-            p3 = (p4[0] - offset, p4[1])
-            
             line_width = max(1, int(3 * self.scale))
             
             try:
-                draw_beziere(surface,[p1, p2, p3, p4],color=drag_color,width= line_width)
+                draw_beziere(surface, points, color=drag_color, width=line_width)
             except AttributeError as E:
                 print(E)
-                pg.draw.line(surface, drag_color, p1, p4, line_width)
+                pg.draw.line(surface, drag_color, points[0], points[3], line_width)
         
-        self.ui_panel.draw(surface)
+        with PROFILER.scope("ui_panel"):
+            self.ui_panel.draw(surface)
+
+    def draw_arrays(self, surface, editor_offset, lod, area=None):
+        """LOD-Darstellung in einem vektorisierten Durchlauf über alle Nodes/Edges
+        (gleiches Ergebnis wie Edge.draw / Node.draw_lod)."""
+        x, y, w, h = area or (0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        viewport = (x - CULL_PADDING, y - CULL_PADDING, w + 2 * CULL_PADDING, h + 2 * CULL_PADDING)
+        with PROFILER.scope("edges"):
+            colors, lines = self.arrays.edge_lines(editor_offset, self.scale, viewport)
+            for color, (x1, y1, x2, y2) in zip(colors, lines.tolist()):
+                pg.draw.line(surface, color, (x1, y1), (x2, y2), 1)
+
+        with PROFILER.scope("nodes"):
+            _, rects = self.arrays.screen_rects(editor_offset, self.scale, viewport)
+            header_height = int(Node.HEADER_HEIGHT * self.scale)
+            for rect in rects.tolist():
+                surface.fill(NODE_COLOR, rect)
+                if lod == LOD_SIMPLE:
+                    surface.fill(NODE_HEADER_COLOR, (rect[0], rect[1], rect[2], header_height))
+        PROFILER.count("edges drawn", len(lines))
+        PROFILER.count("nodes drawn", len(rects))
 
 
 
 def main_loop():
     editor = NodeEditor()
     running = True
+    PROFILER.add_gauge("text cache %", lambda: TEXT_CACHE.hit_rate() * 100)
+    PROFILER.add_gauge("nodes total", lambda: len(editor.graph.nodes) + len(editor.stubs))
+    overlay_rect = None
+    # Dirty Rects werden hier ohne Clip gezeichnet und nur der Bereich selbst übernommen:
+    # pygame rastert geclippte Linien leicht anders als ungeclippte
+    back_buffer = pg.Surface(SCREEN.get_size())
 
     while running:
+        events = pg.event.get()
+        if not events and DIRTY_RECT_RENDERING and not PROFILER.enabled and not editor.is_animating():
+            # Nichts zu tun: bis zum nächsten Event schlafen (Timeout, damit der Autosave weiterläuft)
+            event = pg.event.wait(IDLE_WAIT_MS)
+            if event.type != pg.NOEVENT:
+                events = [event] + pg.event.get()
+
+        PROFILER.begin_frame()
         mouse_pos = pg.mouse.get_pos()
         editor_offset = (editor.offset_x, editor.offset_y)
         
         # -----------------
         # Event Handling
         # -----------------
-        for event in pg.event.get():
+        events_start = PROFILER.start()
+        for event in events:
             if event.type == pg.QUIT:
                 running = False
             
+            elif event.type in (pg.VIDEOEXPOSE, pg.WINDOWEXPOSED):
+                editor.damage.invalidate()
+            
             elif event.type == pg.MOUSEWHEEL:
                 zoom_factor = 1.0 + (event.y * 0.1)
                 editor.set_scale(editor.scale * zoom_factor, mouse_pos)
@@ -645,22 +1460,41 @@ def main_loop():
                     editor.set_scale(editor.scale * 0.9, event.pos)
 
             # --- NODE HANDLING ---
-            for node in editor.nodes:
-                node.handle_event(event, editor_offset, editor.scale)
+            # Nur an den Node unter der Maus bzw. den fokussierten Node; Tippen im Titel löst keine Shortcuts aus
+            typing = editor.events.dispatch(event)
                 
             editor.ui_panel.handle_event(event)
 
-            if event.type == pg.KEYDOWN:
+            if event.type == pg.KEYDOWN and not typing:
                 if event.key == pg.K_a: 
                     # Fügt Node hinzu (könnte auch eine Methode des Editors sein)
                     preset = random.choice(editor.factory.presets)
                     new_node_x = (SCREEN_WIDTH // 2 - editor.offset_x) / editor.scale
                     new_node_y = (SCREEN_HEIGHT // 2 - editor.offset_y) / editor.scale
-                    editor.nodes.append(preset.create_node(new_node_x, new_node_y))
+                    editor.add_node(preset.create_node(new_node_x, new_node_y))
                 if event.key == pg.K_s:
-                    editor.save_state()
+                    # Speichert im Hintergrund (Journal + Übernahme in SAVE_FILE)
+                    editor.autosaver.save_now(editor)
                 if event.key == pg.K_l:
                     editor.load_state()
+                if event.key == pg.K_e:
+                    editor.evaluate()
+                if event.key == pg.K_z and event.mod & pg.KMOD_CTRL:
+                    # Strg+Z rückgängig, Strg+Umschalt+Z wiederholen
+                    if event.mod & pg.KMOD_SHIFT:
+                        editor.redo()
+                    else:
+                        editor.undo()
+                if event.key == pg.K_y and event.mod & pg.KMOD_CTRL:
+                    editor.redo()
+                if event.key == pg.K_m:
+                    print(format_report(editor.memory_report()))
+                if event.key == pg.K_F3:
+                    PROFILER.toggle()
+                if event.key == pg.K_F4:
+                    for ext in (".csv", ".json"):
+                        frames = PROFILER.dump(PROFILE_DUMP_FILE + ext)
+                    print(f"\n✅ {frames} Frames nach '{PROFILE_DUMP_FILE}.csv/.json' geschrieben. (F4-Taste)")
 
             elif event.type == pg.MOUSEBUTTONDOWN:
                 if event.button == 1:
@@ -673,26 +1507,17 @@ def main_loop():
                             editor.current_drag_socket = clicked_socket
                             editor.drag_start_pos = clicked_socket.get_pos(editor_offset, editor.scale)
                         else:
-                            clicked_node = None
-                            for node in reversed(editor.nodes):
-                                if node.get_global_rect(editor_offset, editor.scale).collidepoint(mouse_pos):
-                                    if not node.is_editing_title:
-                                        clicked_node = node
-                                        break
+                            clicked_node = editor.get_node_at_pos(mouse_pos, skip_editing=True)
                                     
                             if clicked_node:
-                                clicked_node.start_drag(mouse_pos, editor_offset, editor.scale)
+                                editor.events.start_drag(clicked_node, mouse_pos)
                             else:
                                 editor.is_panning = True
                                 editor.pan_start_x = mouse_pos[0] - editor.offset_x
                                 editor.pan_start_y = mouse_pos[1] - editor.offset_y
                 
                 elif event.button == 3: # Rechtsklick (Löschen)
-                    clicked_node = None
-                    for node in reversed(editor.nodes):
-                        if node.get_global_rect(editor_offset, editor.scale).collidepoint(mouse_pos):
-                            clicked_node = node
-                            break
+                    clicked_node = editor.get_node_at_pos(mouse_pos)
                     
                     if clicked_node:
                         editor.remove_node(clicked_node)
@@ -700,8 +1525,7 @@ def main_loop():
 
             elif event.type == pg.MOUSEBUTTONUP:
                 if event.button == 1:
-                    for node in editor.nodes:
-                        node.stop_drag()
+                    editor.events.stop_drag()
 
                     if editor.current_drag_socket:
                         target_socket = editor.get_socket_at_pos_global(mouse_pos)
@@ -714,28 +1538,59 @@ def main_loop():
                         editor.drag_start_pos = None
 
                     editor.is_panning = False
+        PROFILER.stop("events", events_start)
         
         # -----------------
         # Aktualisierung
         # -----------------
-        for node in editor.nodes:
-            node.update(mouse_pos, editor_offset, editor.scale)
+        with PROFILER.scope("update"):
+            editor.events.update(mouse_pos)
             
         if editor.is_panning:
-            editor.offset_x = mouse_pos[0] - editor.pan_start_x
-            editor.offset_y = mouse_pos[1] - editor.pan_start_y
+            offset = (mouse_pos[0] - editor.pan_start_x, mouse_pos[1] - editor.pan_start_y)
+            if offset != (editor.offset_x, editor.offset_y):
+                editor.offset_x, editor.offset_y = offset
+                editor.damage.invalidate()
+                editor.autosaver.mark_view_changed()
+        
+        with PROFILER.scope("autosave"):
+            editor.autosaver.tick(editor)
 
 
         # -----------------
         # Zeichnen
         # -----------------
-        SCREEN.fill(BLACK)
-        
-        editor.draw(SCREEN)
-
-        pg.display.flip()
+        if DIRTY_RECT_RENDERING:
+            # Nur die beschädigten Bereiche löschen und neu zeichnen
+            editor.damage_drag_preview(mouse_pos)
+            if overlay_rect is not None:
+                editor.damage.add(overlay_rect)
+                overlay_rect = None
+            rects = editor.damage.pop()
+            for rect in rects:
+                back_buffer.fill(BLACK, rect)
+                editor.draw(back_buffer, rect)
+                SCREEN.blit(back_buffer, rect, rect)
+        else:
+            rects = None
+            SCREEN.fill(BLACK)
+            editor.draw(SCREEN)
+
+        if PROFILER.enabled:
+            with PROFILER.scope("overlay"):
+                overlay_rect = PROFILER.draw_overlay(SCREEN, NORM_FONT)
+            if rects is not None:
+                rects.append(overlay_rect)
+
+        with PROFILER.scope("flip"):
+            if rects is None:
+                pg.display.flip()
+            elif rects:
+                pg.display.update(rects)
+        PROFILER.end_frame()
         CLOCK.tick(60)
 
+    editor.autosaver.close(editor)
     pg.quit()
 
 
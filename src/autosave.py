@@ -0,0 +1,252 @@
+"""
+Background, incremental autosave.
+
+The editor reports changed/removed nodes and edges to an AutoSaver. Every
+AUTOSAVE_INTERVAL seconds only those changes are serialized (on the main
+thread, proportional to the size of the change) and appended to a journal
+next to the save file by a background thread. Every few journal writes, or
+when asked to, the journal is compacted into the full save file: the last
+save is read, the journal applied and the save atomically replaced via
+temp file + rename. Applying a journal is idempotent, so a crash between
+rename and journal removal is harmless.
+
+Compaction parses and writes the whole graph. json holds the GIL for the
+whole parse, so it runs in a child process (python -m src.autosave); the
+worker thread only waits for it and the frame loop keeps running.
+
+Journal lines are JSON objects:
+    {"op": "node", "data": {...}}        node added or changed (Node.to_dict)
+    {"op": "del_node", "id": 3}
+    {"op": "edge", "key": [...]}         key = start id, start socket, end id, end socket
+    {"op": "del_edge", "key": [...]}
+    {"op": "view", "editor_offset_x": ..., "editor_offset_y": ..., "scale": ..., "next_node_id": ...}
+"""
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+from time import time
+
+from src.binary_save import read_save, write_save
+
+JOURNAL_SUFFIX = ".journal"
+# Verzeichnis, aus dem `python -m src.autosave` gestartet wird
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def edge_key(edge):
+    return (edge.start_socket.node.id, edge.start_socket.name, edge.end_socket.node.id, edge.end_socket.name)
+
+
+def edge_dict(key):
+    return {
+        "start_node_id": key[0],
+        "start_socket_name": key[1],
+        "end_node_id": key[2],
+        "end_socket_name": key[3]
+    }
+
+
+def write_atomic(path, data):
+    """Writes a save to a temp file (same format) and renames it over path."""
+    base, ext = os.path.splitext(path)
+    tmp_path = f"{base}.tmp{ext}"
+    write_save(tmp_path, data)
+    os.replace(tmp_path, path)
+
+
+def compact_journal(save_path, journal_path=None):
+    """Applies the journal to the save file and removes it. Returns the number of applied entries."""
+    journal_path = journal_path or save_path + JOURNAL_SUFFIX
+    if not os.path.exists(journal_path):
+        return 0
+
+    if os.path.exists(save_path):
+        data = read_save(save_path)
+    else:
+        data = {"nodes": [], "edges": []}
+
+    nodes = {n["id"]: n for n in data["nodes"]}
+    edges = {(e["start_node_id"], e["start_socket_name"], e["end_node_id"], e["end_socket_name"]): e for e in data["edges"]}
+    applied = 0
+    with open(journal_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Unvollständige letzte Zeile (Absturz während des Schreibens)
+                break
+            op = entry["op"]
+            if op == "node":
+                nodes[entry["data"]["id"]] = entry["data"]
+            elif op == "del_node":
+                nodes.pop(entry["id"], None)
+            elif op == "edge":
+                key = tuple(entry["key"])
+                edges[key] = edge_dict(key)
+            elif op == "del_edge":
+                edges.pop(tuple(entry["key"]), None)
+            elif op == "view":
+                del entry["op"]
+                data.update(entry)
+            applied += 1
+
+    data["nodes"] = list(nodes.values())
+    data["edges"] = [e for key, e in edges.items() if key[0] in nodes and key[2] in nodes]
+    write_atomic(save_path, data)
+    os.remove(journal_path)
+    return applied
+
+
+def compact_journal_in_process(save_path, journal_path=None):
+    """compact_journal in a child process, so the caller's GIL stays free. Returns the number of applied entries."""
+    journal_path = journal_path or save_path + JOURNAL_SUFFIX
+    if not os.path.exists(journal_path):
+        return 0
+    result = subprocess.run(
+        [sys.executable, "-m", "src.autosave", os.path.abspath(save_path), os.path.abspath(journal_path)],
+        cwd=ROOT_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        raise RuntimeError(f"Compaction failed: {lines[-1] if lines else result.returncode}")
+    return int(result.stdout)
+
+
+class AutoSaver:
+    """Collects changes since the last snapshot and journals them on a background thread."""
+    def __init__(self, save_path, interval=2.0, compact_every=50):
+        self.save_path = save_path
+        self.journal_path = save_path + JOURNAL_SUFFIX
+        self.interval = interval
+        self.compact_every = compact_every
+
+        self.changed_nodes = {}
+        self.removed_nodes = set()
+        self.edge_ops = {}
+        self.view_changed = False
+
+        self.last_snapshot = time()
+        self.journal_writes = 0
+        self.error = None
+        self._queue = queue.Queue()
+        self._thread = None
+
+    # --- Change tracking (main thread) ---
+    def node_changed(self, node):
+        self.changed_nodes[node.id] = node
+        self.removed_nodes.discard(node.id)
+
+    def node_removed(self, node_id):
+        self.changed_nodes.pop(node_id, None)
+        self.removed_nodes.add(node_id)
+
+    def edge_added(self, edge):
+        self.edge_ops[edge_key(edge)] = True
+
+    def edge_removed(self, edge):
+        self.edge_ops[edge_key(edge)] = False
+
+    def mark_view_changed(self):
+        self.view_changed = True
+
+    def has_changes(self):
+        return bool(self.changed_nodes or self.removed_nodes or self.edge_ops or self.view_changed)
+
+    def reset(self):
+        """Forgets all pending changes (e.g. after loading a save)."""
+        self.changed_nodes.clear()
+        self.removed_nodes.clear()
+        self.edge_ops.clear()
+        self.view_changed = False
+
+    def retarget(self, save_path):
+        """Journals into another save file from now on (e.g. after loading it)."""
+        self.wait()
+        self.save_path = save_path
+        self.journal_path = save_path + JOURNAL_SUFFIX
+        self.journal_writes = 0
+        self.reset()
+
+    # --- Snapshots ---
+    def snapshot(self, editor):
+        """Serializes the pending changes and hands them to the worker. O(changes)."""
+        lines = []
+        for node in self.changed_nodes.values():
+            lines.append(json.dumps({"op": "node", "data": node.to_dict()}))
+        for node_id in self.removed_nodes:
+            lines.append(json.dumps({"op": "del_node", "id": node_id}))
+        for key, added in self.edge_ops.items():
+            lines.append(json.dumps({"op": "edge" if added else "del_edge", "key": key}))
+        lines.append(json.dumps(dict(op="view", **editor.get_view_state())))
+        self.reset()
+        self.last_snapshot = time()
+
+        self._submit("journal", (self.journal_path, "\n".join(lines) + "\n"))
+        self.journal_writes += 1
+        if self.journal_writes >= self.compact_every:
+            self.compact()
+
+    def tick(self, editor):
+        """Call once per frame; snapshots at most every `interval` seconds."""
+        if self.has_changes() and time() - self.last_snapshot >= self.interval:
+            self.snapshot(editor)
+
+    def compact(self):
+        self.journal_writes = 0
+        self._submit("compact", (self.save_path, self.journal_path))
+
+    def save_now(self, editor):
+        """Journals all pending changes and compacts them into the save file (in the background)."""
+        self.snapshot(editor)
+        self.compact()
+
+    def wait(self):
+        """Blocks until the worker has finished all queued tasks."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self, editor=None):
+        if editor is not None and self.has_changes():
+            self.save_now(editor)
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    # --- Worker thread ---
+    def _submit(self, kind, payload):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="autosave", daemon=True)
+            self._thread.start()
+        self._queue.put((kind, payload))
+
+    def _worker(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                self._queue.task_done()
+                return
+            kind, payload = task
+            try:
+                if kind == "journal":
+                    journal_path, text = payload
+                    with open(journal_path, "a") as f:
+                        f.write(text)
+                elif kind == "compact":
+                    compact_journal_in_process(*payload)
+            except Exception as e:
+                self.error = e
+                print(f"\n❌ Fehler beim Autosave: {e}")
+            finally:
+                self._queue.task_done()
+
+
+if __name__ == "__main__":
+    # Kindprozess von compact_journal_in_process: python -m src.autosave SAVE [JOURNAL]
+    print(compact_journal(*sys.argv[1:3]))
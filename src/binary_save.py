@@ -0,0 +1,262 @@
+"""
+Compact binary save format.
+
+Holds the same data as the JSON layout written by NodeEditor.save_state,
+but all strings (titles, socket names, types, presets) are stored once in
+a string table, identical input/output def lists once in a def table, and
+nodes/edges as fixed-width records:
+
+    header      MAGIC, version, counts, editor offset/scale, next node id
+    strings     u32 length + utf-8 bytes
+    def lists   u16 count + count * (u32 name, u32 type)
+    nodes       u32 id, u32 title, u32 preset, f64 x, f64 y, u32 inputs, u32 outputs, u32 params
+    edges       u32 start node, u32 start socket, u32 end node, u32 end socket
+
+Params are stored as JSON strings in the string table (NONE = no params).
+The format is selected by file extension, see is_binary_path.
+
+Usage: python -m src.binary_save nodes_save.json nodes_save.ngb
+"""
+import json
+import struct
+import sys
+
+MAGIC = b"NGRB"
+VERSION = 1
+BINARY_EXTENSION = ".ngb"
+NONE = 0xFFFFFFFF
+
+HEADER = struct.Struct("<4sHHIIIIdddI")
+STRING_LEN = struct.Struct("<I")
+DEF_COUNT = struct.Struct("<H")
+DEF_ENTRY = struct.Struct("<II")
+NODE_RECORD = struct.Struct("<IIIddIII")
+EDGE_RECORD = struct.Struct("<IIII")
+
+
+class BinaryFormatError(ValueError):
+    """The file is not a (supported) binary save."""
+
+
+def is_binary_path(path):
+    return str(path).lower().endswith(BINARY_EXTENSION)
+
+
+class _Table:
+    """Interns values and hands out their index."""
+    def __init__(self):
+        self.index = {}
+        self.values = []
+
+    def add(self, value):
+        i = self.index.get(value)
+        if i is None:
+            i = self.index[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+
+def dump_binary(data, f):
+    """Writes save data (JSON layout) in the binary format to a binary file."""
+    strings = _Table()
+    defs = _Table()
+
+    def def_list(socket_defs):
+        return defs.add(tuple((strings.add(name), strings.add(data_type)) for name, data_type in socket_defs))
+
+    node_records = []
+    for n in data["nodes"]:
+        params = n.get("params")
+        node_records.append(NODE_RECORD.pack(
+            n["id"],
+            strings.add(n["title"]),
+            strings.add(n.get("preset", n["title"])),
+            n["x"],
+            n["y"],
+            def_list(n["input_defs"]),
+            def_list(n["output_defs"]),
+            strings.add(json.dumps(params, separators=(",", ":"))) if params else NONE
+        ))
+
+    edge_records = [EDGE_RECORD.pack(
+        e["start_node_id"],
+        strings.add(e["start_socket_name"]),
+        e["end_node_id"],
+        strings.add(e["end_socket_name"])
+    ) for e in data["edges"]]
+
+    f.write(HEADER.pack(
+        MAGIC, VERSION, 0,
+        len(strings.values), len(defs.values), len(node_records), len(edge_records),
+        data.get("editor_offset_x", 0), data.get("editor_offset_y", 0), data.get("scale", 1.0),
+        data.get("next_node_id", 0)
+    ))
+    for s in strings.values:
+        raw = s.encode("utf-8")
+        f.write(STRING_LEN.pack(len(raw)))
+        f.write(raw)
+    for entries in defs.values:
+        f.write(DEF_COUNT.pack(len(entries)))
+        for entry in entries:
+            f.write(DEF_ENTRY.pack(*entry))
+    f.write(b"".join(node_records))
+    f.write(b"".join(edge_records))
+
+
+class BinaryReader:
+    """Streaming reader: header, strings and def lists are read up front,
+    node and edge records are read in chunks while iterating.
+    iter_nodes() has to be consumed before iter_edges()."""
+    def __init__(self, f, chunk_size=4096):
+        self.f = f
+        self.chunk_size = chunk_size
+        head = f.read(HEADER.size)
+        if len(head) < HEADER.size:
+            raise BinaryFormatError("File too short")
+        (magic, version, _flags, n_strings, n_defs, self.node_count, self.edge_count,
+         self.offset_x, self.offset_y, self.scale, self.next_node_id) = HEADER.unpack(head)
+        if magic != MAGIC:
+            raise BinaryFormatError("Not a binary node graph")
+        if version > VERSION:
+            raise BinaryFormatError(f"Unsupported version {version}")
+
+        self.strings = []
+        for _ in range(n_strings):
+            (length,) = STRING_LEN.unpack(f.read(STRING_LEN.size))
+            self.strings.append(f.read(length).decode("utf-8"))
+
+        # Nodes with identical socket defs share the same (immutable) def tuples,
+        # so the editor can intern and look them up without converting them per node
+        self.defs = []
+        for _ in range(n_defs):
+            (count,) = DEF_COUNT.unpack(f.read(DEF_COUNT.size))
+            raw = f.read(count * DEF_ENTRY.size)
+            self.defs.append(tuple((self.strings[name], self.strings[data_type]) for name, data_type in DEF_ENTRY.iter_unpack(raw)))
+
+    def meta(self):
+        return {
+            "node_count": self.node_count,
+            "edge_count": self.edge_count,
+            "editor_offset_x": self.offset_x,
+            "editor_offset_y": self.offset_y,
+            "scale": self.scale,
+            "next_node_id": self.next_node_id
+        }
+
+    def _iter_records(self, record, count):
+        remaining = count
+        while remaining:
+            n = min(self.chunk_size, remaining)
+            raw = self.f.read(n * record.size)
+            if len(raw) < n * record.size:
+                raise BinaryFormatError("Unexpected end of file")
+            yield from record.iter_unpack(raw)
+            remaining -= n
+
+    def iter_nodes(self):
+        strings, defs = self.strings, self.defs
+        for node_id, title, preset, x, y, inputs, outputs, params in self._iter_records(NODE_RECORD, self.node_count):
+            yield {
+                "id": node_id,
+                "title": strings[title],
+                "x": x,
+                "y": y,
+                "input_defs": defs[inputs],
+                "output_defs": defs[outputs],
+                "preset": strings[preset],
+                "params": json.loads(strings[params]) if params != NONE else {}
+            }
+
+    def iter_edges(self):
+        strings = self.strings
+        for start_node, start_socket, end_node, end_socket in self._iter_records(EDGE_RECORD, self.edge_count):
+            yield {
+                "start_node_id": start_node,
+                "start_socket_name": strings[start_socket],
+                "end_node_id": end_node,
+                "end_socket_name": strings[end_socket]
+            }
+
+
+def load_binary(f):
+    """Reads a binary save and returns it in the JSON layout."""
+    reader = BinaryReader(f)
+    data = reader.meta()
+    del data["node_count"], data["edge_count"]
+    data["nodes"] = list(reader.iter_nodes())
+    data["edges"] = list(reader.iter_edges())
+    return data
+
+
+def write_save(path, data):
+    """Writes save data as binary or JSON, depending on the file extension."""
+    if is_binary_path(path):
+        with open(path, "wb") as f:
+            dump_binary(data, f)
+    else:
+        with open(path, "w") as f:
+            json.dump(data, f, indent=4)
+
+
+def read_save(path):
+    """Reads save data as binary or JSON, depending on the file extension."""
+    if is_binary_path(path):
+        with open(path, "rb") as f:
+            return load_binary(f)
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def stream_save(path):
+    """Opens a save for streaming. Returns (meta, node records, edge records);
+    the node records have to be consumed before the edge records.
+
+    Binary saves are read in chunks, JSON saves are parsed at once (the json
+    module can not stream) but handed out the same way.
+    """
+    if is_binary_path(path):
+        def records():
+            with open(path, "rb") as f:
+                reader = BinaryReader(f)
+                yield reader.meta()
+                yield from reader.iter_nodes()
+                yield None
+                yield from reader.iter_edges()
+        stream = records()
+        meta = next(stream)
+
+        def nodes():
+            for record in stream:
+                if record is None:
+                    return
+                yield record
+        return meta, nodes(), stream
+
+    with open(path, "r") as f:
+        data = json.load(f)
+    meta = {
+        "node_count": len(data["nodes"]),
+        "edge_count": len(data["edges"]),
+        "editor_offset_x": data.get("editor_offset_x", 0),
+        "editor_offset_y": data.get("editor_offset_y", 0),
+        "scale": data.get("scale", 1.0),
+        "next_node_id": data.get("next_node_id", 0)
+    }
+    return meta, iter(data["nodes"]), iter(data["edges"])
+
+
+def convert_json_to_binary(json_path, binary_path):
+    """Converts an existing JSON save into the binary format."""
+    with open(json_path, "r") as f:
+        data = json.load(f)
+    with open(binary_path, "wb") as f:
+        dump_binary(data, f)
+    return len(data["nodes"]), len(data["edges"])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m src.binary_save <save.json> <save.ngb>")
+        sys.exit(1)
+    nodes, edges = convert_json_to_binary(sys.argv[1], sys.argv[2])
+    print(f"{nodes} Nodes, {edges} Edges -> {sys.argv[2]}")
@@ -1,4 +1,5 @@
 from src.modules import *
+from src.fonts import FontRegistry
 
 SCREEN_WIDTH = 1000
 SCREEN_HEIGHT = 600
@@ -6,8 +7,25 @@ SCREEN_HEIGHT = 600
 FONT_NAME = 'Consolas'
 FONT_SIZE_BASE = 13
 FONT_MIN_SIZE_DRAW = 10
+FONT_SIZE_STEP = 1 # Quantisierung der Zoom-Fontgrößen in Pixeln
 SAVE_FILE = "nodes_save.json"
+PROFILE_DUMP_FILE = "frame_profile" # F4 schreibt .csv und .json
+AUTOSAVE_INTERVAL = 2.0 # Sekunden zwischen zwei Journal-Einträgen
+AUTOSAVE_COMPACT_EVERY = 30 # Journal-Einträge bis zur Übernahme in SAVE_FILE
+LAZY_LOAD_MIN_NODES = 5000 # ab dieser Größe werden Nodes erst bei Sichtbarkeit erzeugt
 CULL_PADDING = 50 
+USE_NODE_ARRAYS = True # LOD-Zeichnen über numpy-Arrays (falls numpy installiert ist)
+DIRTY_RECT_RENDERING = True # nur geänderte Bereiche neu zeichnen, im Leerlauf auf Events warten
+IDLE_WAIT_MS = 250 # max. Schlafdauer im Leerlauf (Autosave läuft weiter)
+UINODE_COMPACT_SOCKETS = False # UINode zeichnet seine Sockets selbst statt je ein UIElement (opt-in, nicht gegen echtes pig_ui geprüft)
+HISTORY_MAX_BYTES = 16 * 1024 * 1024 # ungefähre Speicherobergrenze für Undo/Redo (geschätzt, siehe src/history.py), älteste Einträge fallen weg
+
+# Level of Detail: unterhalb dieser Zoomstufen wird vereinfacht gezeichnet
+LOD_FULL = 0
+LOD_SIMPLE = 1   # flache Nodes ohne Sockets, gerade Edges
+LOD_MINIMAL = 2  # Nodes nur noch als gefüllte Rechtecke
+LOD_SIMPLE_SCALE = 0.5
+LOD_MINIMAL_SCALE = 0.3
 
 WHITE = Color('#ffffff')
 BLACK = Color('#000000')
@@ -25,4 +43,5 @@ DATA_TYPES = {
 }
 DEFAULT_SOCKET_COLOR = Color('#C86400')
 
-NORM_FONT = pg.font.SysFont('Consolas',FONT_SIZE_BASE)
\ No newline at end of file
+FONTS = FontRegistry(FONT_NAME, FONT_SIZE_BASE, FONT_SIZE_STEP)
+NORM_FONT = FONTS.get(FONT_SIZE_BASE)
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Damaged screen regions for partial redraws.
+
+Everything that changes the picture reports the screen area it touched
+(old and new position of a moved Node, a new Edge, the drag preview, ...).
+Once per frame pop() returns the merged regions; only those are cleared,
+redrawn and passed to pg.display.update. Changes that affect the whole
+view (pan, zoom, loading) call invalidate().
+"""
+import pygame as pg
+
+
+class DirtyRegions:
+    """Collects damaged rects in screen space; see module docstring."""
+    MAX_RECTS = 16  # darüber lohnt sich das Zusammenfassen nicht mehr
+    FULL_RATIO = 0.5  # ab diesem Anteil am Bildschirm wird komplett neu gezeichnet
+
+    def __init__(self, screen_rect):
+        self.screen_rect = pg.Rect(screen_rect)
+        self.rects = []
+        self.full = True
+
+    def __bool__(self):
+        return self.full or bool(self.rects)
+
+    def invalidate(self):
+        self.full = True
+        self.rects.clear()
+
+    def add(self, rect):
+        if self.full:
+            return
+        rect = pg.Rect(rect).clip(self.screen_rect)
+        if rect.width and rect.height:
+            self.rects.append(rect)
+
+    def pop(self):
+        """Merged damaged rects since the last call (the whole screen after invalidate)."""
+        if self.full:
+            self.full = False
+            self.rects.clear()
+            return [self.screen_rect.copy()]
+
+        merged = []
+        for rect in self.rects:
+            # Überlappende Rects vereinigen, bis keins mehr überlappt
+            i = rect.collidelist(merged)
+            while i != -1:
+                rect = rect.union(merged.pop(i))
+                i = rect.collidelist(merged)
+            merged.append(rect)
+        self.rects.clear()
+
+        area = sum(rect.width * rect.height for rect in merged)
+        if len(merged) > self.MAX_RECTS or area > self.screen_rect.width * self.screen_rect.height * self.FULL_RATIO:
+            return [self.screen_rect.copy()]
+        return merged
@@ -0,0 +1,365 @@
+"""
+Headless graph evaluation.
+
+A graph (Nodes + Edges, or the dict written by NodeEditor.save_state) is
+compiled once into an ExecutionPlan: a topologically sorted list of steps
+with resolved input bindings. The plan can then be run any number of times.
+Nothing in here needs pygame or a display.
+
+Nodes only need: id, preset_name, params (dict), inputs/outputs (Sockets
+with name and data_type). Edges only need start_socket / end_socket.
+"""
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+
+class CycleError(ValueError):
+    """The graph contains a cycle and can not be scheduled."""
+    def __init__(self, node_ids):
+        self.node_ids = list(node_ids)
+        super().__init__(f"Graph contains a cycle through nodes {self.node_ids}")
+
+
+class EvaluationError(RuntimeError):
+    """A compute function failed; node_id tells which node."""
+    def __init__(self, node_id, error):
+        self.node_id = node_id
+        self.error = error
+        super().__init__(f"Node {node_id} failed: {error!r}")
+
+
+def default_value(data_type):
+    """Value of an unconnected input without a parameter."""
+    if data_type == "int":
+        return 0
+    if data_type == "float":
+        return 0.0
+    if data_type == "str":
+        return ""
+    if data_type == "bool":
+        return False
+    if data_type == "list":
+        return []
+    return None
+
+
+# --- Compute functions: fn(inputs, params) -> {output name: value} ---
+
+def compute_integer(inputs, params):
+    return {"number": int(params.get("number", 0))}
+
+def compute_float(inputs, params):
+    return {"number": float(params.get("number", 0.0))}
+
+def compute_float_to_integer(inputs, params):
+    return {"out": int(inputs["in"])}
+
+def compute_entity_position(inputs, params):
+    return {"x": int(params.get("x", 0)), "y": int(params.get("y", 0))}
+
+def compute_move_to_position(inputs, params):
+    return {"Next": {"entity": inputs["Entity ID"], "x": inputs["x"], "y": inputs["y"]}}
+
+def compute_player(inputs, params):
+    return {"Entity ID": int(params.get("Entity ID", 0))}
+
+def compute_start_node(inputs, params):
+    return {"Name": inputs["Name"]}
+
+COMPUTE_FUNCTIONS = {
+    "Integer": compute_integer,
+    "Float": compute_float,
+    "Float To Integer": compute_float_to_integer,
+    "Entity Position": compute_entity_position,
+    "Move To Position": compute_move_to_position,
+    "Player": compute_player,
+    "Start Node": compute_start_node,
+}
+
+
+def register_compute(preset_name, fn):
+    """Registers (or replaces) the compute function of a preset."""
+    COMPUTE_FUNCTIONS[preset_name] = fn
+
+
+class PlanStep:
+    """One node of the plan with its resolved input bindings."""
+    __slots__ = ("node_id", "preset_name", "compute", "params", "input_defaults", "bindings", "output_names")
+
+    def __init__(self, node, bindings):
+        self.node_id = node.id
+        self.preset_name = node.preset_name
+        self.compute = COMPUTE_FUNCTIONS.get(node.preset_name)
+        # Shared with the node, so value changes do not need a recompile
+        self.params = node.params
+        self.input_defaults = [(s.name, s.data_type) for s in node.inputs]
+        self.bindings = bindings
+        self.output_names = [s.name for s in node.outputs]
+
+    def gather_inputs(self, results):
+        """Input values for this step from the results of its upstream steps."""
+        inputs = {}
+        for name, data_type in self.input_defaults:
+            source = self.bindings.get(name)
+            if source is not None:
+                inputs[name] = results[source[0]].get(source[1])
+            elif name in self.params:
+                inputs[name] = self.params[name]
+            else:
+                inputs[name] = default_value(data_type)
+        return inputs
+
+    def execute(self, inputs):
+        try:
+            return execute_step(self.compute, self.params, inputs, self.output_names)
+        except Exception as e:
+            raise EvaluationError(self.node_id, e) from e
+
+
+def execute_step(compute, params, inputs, output_names):
+    if compute is None:
+        # Unbekanntes Preset: Parameter bzw. gleichnamige Inputs durchreichen
+        return {name: params.get(name, inputs.get(name)) for name in output_names}
+    return compute(inputs, params)
+
+
+def execute_batch(batch):
+    """Runs a list of (compute, params, inputs, output_names) in a worker."""
+    return [execute_step(*job) for job in batch]
+
+
+class ExecutionPlan:
+    """Topologically sorted, reusable execution plan of a graph."""
+    def __init__(self, steps, downstream):
+        self.steps = steps
+        self.index = {step.node_id: i for i, step in enumerate(steps)}
+        # node id -> ids of directly connected downstream nodes
+        self.downstream = downstream
+        self._levels = None
+
+    def __len__(self):
+        return len(self.steps)
+
+    def get_levels(self):
+        """Steps grouped by depth. Steps of one level never depend on each other."""
+        if self._levels is None:
+            depth = {}
+            levels = []
+            for step in self.steps:
+                level = 1 + max((depth[src] for src, _ in step.bindings.values()), default=-1)
+                depth[step.node_id] = level
+                if level == len(levels):
+                    levels.append([])
+                levels[level].append(step)
+            self._levels = levels
+        return self._levels
+
+    @classmethod
+    def compile(cls, nodes, edges):
+        """Builds the plan with Kahn's algorithm; raises CycleError on cycles.
+        If an input has several edges, the last one wins."""
+        nodes = list(nodes)
+        bindings = {node.id: {} for node in nodes}
+        downstream = {node.id: [] for node in nodes}
+        in_degree = {node.id: 0 for node in nodes}
+
+        for edge in edges:
+            src, dst = edge.start_socket.node.id, edge.end_socket.node.id
+            bindings[dst][edge.end_socket.name] = (src, edge.start_socket.name)
+
+        for node_id, node_bindings in bindings.items():
+            for src in {source[0] for source in node_bindings.values()}:
+                downstream[src].append(node_id)
+                in_degree[node_id] += 1
+
+        by_id = {node.id: node for node in nodes}
+        ready = [node.id for node in nodes if in_degree[node.id] == 0]
+        order = []
+        i = 0
+        while i < len(ready):
+            node_id = ready[i]
+            i += 1
+            order.append(node_id)
+            for dst in downstream[node_id]:
+                in_degree[dst] -= 1
+                if in_degree[dst] == 0:
+                    ready.append(dst)
+
+        if len(order) != len(nodes):
+            raise CycleError(node_id for node_id, degree in in_degree.items() if degree > 0)
+
+        steps = [PlanStep(by_id[node_id], bindings[node_id]) for node_id in order]
+        return cls(steps, downstream)
+
+    @classmethod
+    def from_data(cls, data):
+        """Compiles a plan directly from save data (see NodeEditor.save_state)."""
+        nodes, edges = graph_from_data(data)
+        return cls.compile(nodes, edges)
+
+    def run(self):
+        """Executes all steps. Returns {node id: {output name: value}}."""
+        results = {}
+        for step in self.steps:
+            results[step.node_id] = step.execute(step.gather_inputs(results))
+        return results
+
+    def run_parallel(self, workers=None, use_processes=False, executor=None):
+        """Like run(), but every level is split into chunks and executed on a pool.
+
+        Results are identical to run(). Pass an existing executor to reuse it
+        across batch runs; with use_processes the compute functions and values
+        must be picklable.
+        """
+        workers = workers or os.cpu_count() or 1
+        own_executor = executor is None
+        if own_executor:
+            pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+            executor = pool_class(max_workers=workers)
+        try:
+            results = {}
+            for level in self.get_levels():
+                jobs = [(step.compute, step.params, step.gather_inputs(results), step.output_names) for step in level]
+                if len(jobs) < 2:
+                    outputs = [step.execute(job[2]) for step, job in zip(level, jobs)]
+                else:
+                    chunk_size = -(-len(jobs) // workers)
+                    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+                    try:
+                        outputs = [out for chunk in executor.map(execute_batch, chunks) for out in chunk]
+                    except Exception:
+                        # Serial re-run only to name the failing node. If every step succeeds,
+                        # the pool itself failed (pickling, broken pool): that error is raised
+                        for step, job in zip(level, jobs):
+                            step.execute(job[2])
+                        raise
+                for step, step_outputs in zip(level, outputs):
+                    results[step.node_id] = step_outputs
+            return results
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+
+class IncrementalEvaluator:
+    """Re-runs only dirty nodes and the part of their downstream cone whose inputs changed.
+
+    Each node's outputs are memoized together with the inputs and params they
+    were computed from; a node whose inputs did not change is skipped and its
+    downstream nodes are not visited (early cutoff).
+    """
+    def __init__(self, plan=None):
+        self.plan = None
+        self.results = {}
+        self.memo = {}
+        self.dirty = set()
+        self.executed = 0
+        if plan is not None:
+            self.set_plan(plan)
+
+    def set_plan(self, plan):
+        """Uses a new (recompiled) plan; memoized results of existing nodes stay valid."""
+        self.plan = plan
+        for step in plan.steps:
+            if step.node_id not in self.results:
+                self.dirty.add(step.node_id)
+
+    def mark_dirty(self, node_id):
+        self.dirty.add(node_id)
+
+    def forget(self, node_id):
+        """Drops everything known about a removed node."""
+        self.results.pop(node_id, None)
+        self.memo.pop(node_id, None)
+        self.dirty.discard(node_id)
+
+    def reset(self):
+        self.plan = None
+        self.results.clear()
+        self.memo.clear()
+        self.dirty.clear()
+
+    def run(self):
+        """Brings all results up to date. Returns {node id: {output name: value}}."""
+        plan = self.plan
+        heap = [plan.index[node_id] for node_id in self.dirty if node_id in plan.index]
+        heapq.heapify(heap)
+        queued = set(heap)
+        executed = 0
+
+        try:
+            while heap:
+                step = plan.steps[heapq.heappop(heap)]
+                node_id = step.node_id
+                inputs = step.gather_inputs(self.results)
+                memo = self.memo.get(node_id)
+                if memo is not None and memo[0] == inputs and memo[1] == step.params:
+                    continue
+
+                outputs = step.execute(inputs)
+                executed += 1
+                self.memo[node_id] = (inputs, dict(step.params))
+                changed = self.results.get(node_id) != outputs or node_id not in self.results
+                self.results[node_id] = outputs
+                if changed:
+                    for dst in plan.downstream[node_id]:
+                        i = plan.index[dst]
+                        if i not in queued:
+                            queued.add(i)
+                            heapq.heappush(heap, i)
+        except Exception:
+            # Der fehlgeschlagene und alle noch wartenden Nodes bleiben dirty,
+            # sonst sieht der nächste Lauf upstream nur Memo-Treffer
+            self.dirty = {node_id}.union(plan.steps[i].node_id for i in heap)
+            self.executed = executed
+            raise
+
+        self.dirty.clear()
+        self.executed = executed
+        return self.results
+
+
+# --- Leichtgewichtiges Modell für Save-Daten (ohne pygame) ---
+
+class DataSocket:
+    __slots__ = ("name", "data_type", "node", "is_input")
+
+    def __init__(self, name, data_type, node, is_input):
+        self.name = name
+        self.data_type = data_type.lower()
+        self.node = node
+        self.is_input = is_input
+
+
+class DataNode:
+    __slots__ = ("id", "preset_name", "params", "inputs", "outputs")
+
+    def __init__(self, n_data):
+        self.id = n_data["id"]
+        self.preset_name = n_data.get("preset", n_data["title"])
+        self.params = n_data.get("params", {})
+        self.inputs = [DataSocket(n, t, self, True) for n, t in n_data["input_defs"]]
+        self.outputs = [DataSocket(n, t, self, False) for n, t in n_data["output_defs"]]
+
+
+class DataEdge:
+    __slots__ = ("start_socket", "end_socket")
+
+    def __init__(self, start_socket, end_socket):
+        self.start_socket = start_socket
+        self.end_socket = end_socket
+
+
+def graph_from_data(data):
+    """(nodes, edges) from the dict layout written by NodeEditor.save_state."""
+    nodes = [DataNode(n_data) for n_data in data["nodes"]]
+    outputs = {(n.id, s.name): s for n in nodes for s in n.outputs}
+    inputs = {(n.id, s.name): s for n in nodes for s in n.inputs}
+    edges = []
+    for e_data in data["edges"]:
+        start = outputs.get((e_data["start_node_id"], e_data["start_socket_name"]))
+        end = inputs.get((e_data["end_node_id"], e_data["end_socket_name"]))
+        if start and end:
+            edges.append(DataEdge(start, end))
+    return nodes, edges
@@ -0,0 +1,50 @@
+"""
+Process-wide font registry.
+
+pg.font.SysFont does a system font lookup on every call and the editor needs
+a new pixel size on every zoom step. The registry resolves the font path once
+and keeps one Font object per pixel size.
+"""
+import pygame as pg
+
+
+class FontRegistry:
+    """Resolves a system font once and caches Font objects per pixel size."""
+    def __init__(self, name, base_size, size_step=1, min_size=2):
+        self.name = name
+        self.base_size = base_size
+        self.size_step = max(1, size_step)
+        self.min_size = min_size
+        self._path = None
+        self._resolved = False
+        self._fonts = {}
+
+    @property
+    def path(self):
+        """Path of the system font, None = pygame default font."""
+        if not self._resolved:
+            if not pg.font.get_init():
+                pg.font.init()
+            self._path = pg.font.match_font(self.name)
+            self._resolved = True
+        return self._path
+
+    def quantize_size(self, size):
+        size = int(size)
+        size -= size % self.size_step
+        return max(self.min_size, size)
+
+    def get(self, size):
+        """Returns the (shared) Font for a pixel size."""
+        size = self.quantize_size(size)
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = pg.font.Font(self.path, size)
+        return font
+
+    def get_for_scale(self, scale):
+        """Font for a zoom level; sizes are quantized so zooming reuses fonts."""
+        return self.get(self.base_size * scale)
+
+    def __len__(self):
+        return len(self._fonts)
@@ -0,0 +1,84 @@
+"""
+Graph store with adjacency indexes.
+
+Keeps Nodes by id, Edges by (output socket, input socket) and per node, and
+Sockets by (node id, name, is_input), so connecting, disconnecting, removing
+a node and resolving sockets while loading do not scan all edges.
+"""
+
+
+class GraphStore:
+    """Nodes, Edges and Sockets of one graph. Node order = insertion order, which is
+    not necessarily the draw order (lazily loaded Nodes are inserted when created)."""
+    def __init__(self):
+        self.nodes = {}
+        self.edges = {}
+        self.node_edges = {}
+        self.sockets = {}
+
+    @staticmethod
+    def edge_key(edge):
+        return (edge.start_socket, edge.end_socket)
+
+    def clear(self):
+        self.nodes.clear()
+        self.edges.clear()
+        self.node_edges.clear()
+        self.sockets.clear()
+
+    # --- Nodes ---
+    def add_node(self, node):
+        self.nodes[node.id] = node
+        self.node_edges[node.id] = {}
+        for socket in node.inputs + node.outputs:
+            self.sockets[(node.id, socket.name, socket.is_input)] = socket
+        return node
+
+    def has_node(self, node):
+        return self.nodes.get(node.id) is node
+
+    def get_node(self, node_id):
+        return self.nodes.get(node_id)
+
+    def remove_node(self, node):
+        """Removes the node and its edges in O(degree). Returns the removed edges."""
+        if not self.has_node(node):
+            return []
+        removed = list(self.node_edges[node.id].values())
+        for edge in removed:
+            self.remove_edge(edge)
+        del self.nodes[node.id]
+        del self.node_edges[node.id]
+        for socket in node.inputs + node.outputs:
+            self.sockets.pop((node.id, socket.name, socket.is_input), None)
+        return removed
+
+    # --- Sockets ---
+    def get_socket(self, node_id, name, is_input):
+        return self.sockets.get((node_id, name, is_input))
+
+    # --- Edges ---
+    def add_edge(self, edge):
+        key = self.edge_key(edge)
+        self.edges[key] = edge
+        self.node_edges[edge.start_socket.node.id][key] = edge
+        self.node_edges[edge.end_socket.node.id][key] = edge
+        return edge
+
+    def find_edge(self, out_socket, in_socket):
+        return self.edges.get((out_socket, in_socket))
+
+    def remove_edge(self, edge):
+        key = self.edge_key(edge)
+        if self.edges.pop(key, None) is None:
+            return False
+        for node in (edge.start_socket.node, edge.end_socket.node):
+            adjacent = self.node_edges.get(node.id)
+            if adjacent is not None:
+                adjacent.pop(key, None)
+        return True
+
+    def edges_of(self, node):
+        """All edges connected to the node (O(degree))."""
+        adjacent = self.node_edges.get(node.id)
+        return list(adjacent.values()) if adjacent else []
@@ -0,0 +1,212 @@
+"""
+Undo/redo history of editor commands.
+
+Every user edit is recorded as a small command that keeps only what it
+needs to revert itself: the affected Node/Edge objects and, for moves and
+renames, the old and new values. Undo and redo therefore cost as much as
+the change itself, independent of the graph size.
+
+    AddNodes / RemoveNodes   Nodes plus the Edges that came or went with them
+    ToggleEdge               an Edge connected or disconnected (handle_connection)
+    MoveNodes                one whole drag (start and end position per Node)
+    Rename                   one title edit; keystrokes of an edit are merged
+
+The commands call the normal NodeEditor methods, so indexes, evaluation,
+autosave and redraw stay in sync. While a command is replayed the history
+records nothing. The size of the history is capped by an estimate of the
+memory its commands keep alive; the oldest entries are dropped first. The
+estimate uses average sizes from NodeEditor.memory_report, so the cap is
+approximate (cached node surfaces, long titles and params are not counted).
+"""
+from abc import ABC, abstractmethod
+from collections import deque
+
+# Durchschnitt laut memory_report (20k Nodes): Node ~500 B + ~1.9 Sockets à 72 B, Edge 64 B
+NODE_BYTES = 650
+EDGE_BYTES = 64
+ENTRY_BYTES = 100
+
+
+class Command(ABC):
+    """Base class; apply() does the change again, revert() takes it back."""
+    __slots__ = ()
+
+    @abstractmethod
+    def apply(self, editor):
+        pass
+
+    @abstractmethod
+    def revert(self, editor):
+        pass
+
+    def size(self):
+        return ENTRY_BYTES
+
+    def merge(self, command):
+        """Absorbs command (recorded right after this one). Returns True if it did."""
+        return False
+
+
+class AddNodes(Command):
+    __slots__ = ("nodes", "edges")
+
+    def __init__(self, nodes, edges=()):
+        self.nodes = list(nodes)
+        self.edges = list(edges)
+
+    def apply(self, editor):
+        for node in self.nodes:
+            editor.add_node(node)
+        for edge in self.edges:
+            editor.add_edge(edge)
+
+    def revert(self, editor):
+        # remove_node nimmt die Edges des Nodes mit
+        for node in reversed(self.nodes):
+            editor.remove_node(node)
+
+    def size(self):
+        return ENTRY_BYTES + len(self.nodes) * NODE_BYTES + len(self.edges) * EDGE_BYTES
+
+
+class RemoveNodes(AddNodes):
+    __slots__ = ()
+    apply, revert = AddNodes.revert, AddNodes.apply
+
+
+class ToggleEdge(Command):
+    __slots__ = ("edge", "added")
+
+    def __init__(self, edge, added):
+        self.edge = edge
+        self.added = added
+
+    def _set(self, editor, present):
+        if present:
+            editor.add_edge(self.edge)
+        else:
+            editor.remove_edge(self.edge)
+
+    def apply(self, editor):
+        self._set(editor, self.added)
+
+    def revert(self, editor):
+        self._set(editor, not self.added)
+
+    def size(self):
+        return ENTRY_BYTES + EDGE_BYTES
+
+
+class MoveNodes(Command):
+    __slots__ = ("moves",)
+
+    def __init__(self, moves):
+        self.moves = moves  # [(node, (old x, old y), (new x, new y))]
+
+    def _set(self, editor, which):
+        for move in self.moves:
+            node = move[0]
+            node.x, node.y = move[which]
+            editor.update_node_index(node)
+
+    def apply(self, editor):
+        self._set(editor, 2)
+
+    def revert(self, editor):
+        self._set(editor, 1)
+
+    def size(self):
+        return ENTRY_BYTES + len(self.moves) * ENTRY_BYTES
+
+
+class Rename(Command):
+    __slots__ = ("node", "old", "new", "open")
+
+    def __init__(self, node, old, new, open=False):
+        self.node = node
+        self.old = old
+        self.new = new
+        self.open = open  # Bearbeitung läuft noch: weitere Tastendrücke werden angehängt
+
+    def apply(self, editor):
+        self.open = False
+        editor.set_node_title(self.node, self.new)
+
+    def revert(self, editor):
+        self.open = False
+        editor.set_node_title(self.node, self.old)
+
+    def size(self):
+        return ENTRY_BYTES + len(self.old) + len(self.new)
+
+    def merge(self, command):
+        if not (self.open and isinstance(command, Rename) and command.node is self.node):
+            return False
+        self.new = command.new
+        self.open = command.open
+        return True
+
+
+class History:
+    """Undo and redo stacks with a memory cap; see module docstring."""
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.bytes = 0
+        self.replaying = False
+
+    def __len__(self):
+        return len(self.undo_stack)
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.bytes = 0
+
+    def seal(self):
+        """Stops merging into the last command (a title edit was finished)."""
+        if self.undo_stack and isinstance(self.undo_stack[-1], Rename):
+            self.undo_stack[-1].open = False
+
+    def record(self, command):
+        """Adds a command that was just executed. Drops the redo stack."""
+        if self.replaying:
+            return
+        for old in self.redo_stack:
+            self.bytes -= old.size()
+        self.redo_stack.clear()
+
+        if self.undo_stack:
+            last = self.undo_stack[-1]
+            before = last.size()
+            if last.merge(command):
+                self.bytes += last.size() - before
+                return
+        self.undo_stack.append(command)
+        self.bytes += command.size()
+        # Älteste Einträge verwerfen, der neueste bleibt immer
+        while self.bytes > self.max_bytes and len(self.undo_stack) > 1:
+            self.bytes -= self.undo_stack.popleft().size()
+
+    def _replay(self, source, target, editor, undo):
+        if not source:
+            return False
+        command = source.pop()
+        self.replaying = True
+        try:
+            if undo:
+                command.revert(editor)
+            else:
+                command.apply(editor)
+        finally:
+            self.replaying = False
+        target.append(command)
+        return True
+
+    def undo(self, editor):
+        """Reverts the last command. Returns False if there is nothing to undo."""
+        return self._replay(self.undo_stack, self.redo_stack, editor, True)
+
+    def redo(self, editor):
+        return self._replay(self.redo_stack, self.undo_stack, editor, False)
@@ -0,0 +1,89 @@
+"""
+Memory footprint of a loaded graph.
+
+Sums sys.getsizeof of the given root objects and everything they own
+(__dict__/__slots__ values, dicts, lists, tuples, strings, ...) per
+category. Objects reachable from several places - shared socket defs,
+interned strings - are counted once, in the first category that reaches
+them. Instances of the `owned_elsewhere` types are only counted as roots of
+their own category, so e.g. Socket.node does not pull Nodes into "sockets".
+Surfaces are counted with their pixel buffers, Fonts are skipped (shared).
+"""
+import sys
+import types
+
+import pygame as pg
+
+_ATOMIC = (str, bytes, int, float, complex, bool, type(None))
+_SKIP = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType, pg.font.Font)
+
+
+def _slot_names(cls):
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        yield from slots
+
+
+def _sizeof(roots, seen, owned_elsewhere):
+    total = 0
+    stack = list(roots)
+    is_root = {id(root) for root in roots}
+    while stack:
+        obj = stack.pop()
+        key = id(obj)
+        if key in seen:
+            continue
+        if isinstance(obj, _SKIP):
+            continue
+        if key not in is_root and isinstance(obj, owned_elsewhere):
+            continue
+        seen.add(key)
+        total += sys.getsizeof(obj)
+        if isinstance(obj, _ATOMIC):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, pg.Surface):
+            total += obj.get_width() * obj.get_height() * obj.get_bytesize()
+        else:
+            attrs = getattr(obj, "__dict__", None)
+            if attrs is not None:
+                stack.append(attrs)
+            for name in _slot_names(type(obj)):
+                value = getattr(obj, name, None)
+                if value is not None:
+                    stack.append(value)
+    return total
+
+
+def memory_report(categories, owned_elsewhere=()):
+    """categories = {name: list of root objects}. Returns
+    {name: {"count", "bytes", "per_item"}, "total": {...}} in category order."""
+    seen = set()
+    report = {}
+    total_count = total_bytes = 0
+    for name, roots in categories.items():
+        roots = list(roots)
+        size = _sizeof(roots, seen, tuple(owned_elsewhere))
+        report[name] = {
+            "count": len(roots),
+            "bytes": size,
+            "per_item": size / len(roots) if roots else 0
+        }
+        total_count += len(roots)
+        total_bytes += size
+    report["total"] = {"count": total_count, "bytes": total_bytes, "per_item": 0}
+    return report
+
+
+def format_report(report):
+    lines = [f"{'':<10}{'count':>10}{'KiB':>12}{'B/item':>10}"]
+    for name, row in report.items():
+        per_item = f"{row['per_item']:.0f}" if row["per_item"] else ""
+        lines.append(f"{name:<10}{row['count']:>10}{row['bytes'] / 1024:>12.1f}{per_item:>10}")
+    return "\n".join(lines)
@@ -0,0 +1,216 @@
+"""
+Struct-of-arrays mirror of the node geometry.
+
+Positions, sizes and z-values of all Nodes (and the socket
+endpoints of all Edges) are kept in NumPy columns, so the world->screen
+transform, culling and socket positions of the whole graph are computed in
+one vectorized pass per frame instead of per object. The editor keeps the
+store in sync from add_node / update_node_index / remove_node, the Node
+objects stay the owners of their data.
+
+numpy is optional: without it HAS_NUMPY is False and the editor draws
+through the per-object path.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+
+
+class _Table:
+    """Columns with reusable slots and an item <-> slot mapping."""
+    FIELDS = ()
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        for name, dtype in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype))
+        self.alive = np.zeros(capacity, "?")
+        self.items = [None] * capacity
+        self.slots = {}
+        self.free = []
+        self.end = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, item):
+        return item in self.slots
+
+    def _grow(self):
+        capacity = self.capacity * 2
+        for name, dtype in self.FIELDS + (("alive", "?"),):
+            column = np.zeros(capacity, dtype)
+            column[:self.capacity] = getattr(self, name)
+            setattr(self, name, column)
+        self.items.extend([None] * (capacity - self.capacity))
+        self.capacity = capacity
+
+    def _alloc(self, item):
+        slot = self.slots.get(item)
+        if slot is not None:
+            return slot
+        if self.free:
+            slot = self.free.pop()
+        else:
+            if self.end == self.capacity:
+                self._grow()
+            slot = self.end
+            self.end += 1
+        self.slots[item] = slot
+        self.items[slot] = item
+        self.alive[slot] = True
+        return slot
+
+    def remove(self, item):
+        slot = self.slots.pop(item, None)
+        if slot is None:
+            return False
+        self.items[slot] = None
+        self.alive[slot] = False
+        self.free.append(slot)
+        return True
+
+    def replace(self, item, new_item):
+        """Hands the slot (and all values) of item over to new_item."""
+        slot = self.slots.pop(item)
+        self.slots[new_item] = slot
+        self.items[slot] = new_item
+        return slot
+
+    def clear(self):
+        self.alive[:] = False
+        self.items = [None] * self.capacity
+        self.slots.clear()
+        self.free.clear()
+        self.end = 0
+
+
+class NodeTable(_Table):
+    FIELDS = (
+        ("x", "f8"),
+        ("y", "f8"),
+        ("width", "f8"),
+        ("height", "f8"),
+        ("z", "i8"),
+    )
+
+
+class EdgeTable(_Table):
+    FIELDS = (
+        ("start_node", "i8"),
+        ("start_index", "i4"),
+        ("end_node", "i8"),
+        ("end_index", "i4"),
+        ("z", "i8"),
+        ("color", "i4"),
+    )
+
+
+class NodeArrays:
+    """Vectorized geometry of all Nodes and Edges of the editor.
+
+    Socket i of a node sits at (0 | width, header_height + (i + 0.5) * line_height),
+    like Socket.get_local_pos, so socket positions follow from x, y and width.
+    """
+    def __init__(self, header_height, line_height, capacity=1024):
+        self.header_height = header_height
+        self.line_height = line_height
+        self.nodes = NodeTable(capacity)
+        self.edges = EdgeTable(capacity)
+        self.palette = []
+        self._palette_index = {}
+
+    def clear(self):
+        self.nodes.clear()
+        self.edges.clear()
+
+    # --- Nodes ---
+    def set_node(self, node, z=None):
+        """Adds the node or updates its geometry."""
+        table = self.nodes
+        slot = table._alloc(node)
+        table.x[slot] = node.x
+        table.y[slot] = node.y
+        table.width[slot] = node.width
+        table.height[slot] = node.height
+        if z is not None:
+            table.z[slot] = z
+        return slot
+
+    def remove_node(self, node):
+        return self.nodes.remove(node)
+
+    def replace_node(self, node, new_node):
+        slot = self.nodes.replace(node, new_node)
+        self.set_node(new_node)
+        return slot
+
+    # --- Edges ---
+    def _color_id(self, color):
+        key = tuple(color)
+        i = self._palette_index.get(key)
+        if i is None:
+            i = self._palette_index[key] = len(self.palette)
+            self.palette.append(color)
+        return i
+
+    def set_edge(self, edge, start_node, start_index, end_node, end_index, z, color):
+        table = self.edges
+        slot = table._alloc(edge)
+        table.start_node[slot] = self.nodes.slots[start_node]
+        table.start_index[slot] = start_index
+        table.end_node[slot] = self.nodes.slots[end_node]
+        table.end_index[slot] = end_index
+        table.z[slot] = z
+        table.color[slot] = self._color_id(color)
+        return slot
+
+    def remove_edge(self, edge):
+        return self.edges.remove(edge)
+
+    # --- Vectorized passes ---
+    def screen_rects(self, offset, scale, viewport):
+        """Slots of the visible nodes (see nodes.items) and their screen rects (int Nx4),
+        bottom to top. viewport = (x, y, w, h) in screen coordinates."""
+        t = self.nodes
+        n = t.end
+        left = t.x[:n] * scale + offset[0]
+        top = t.y[:n] * scale + offset[1]
+        width = t.width[:n] * scale
+        height = t.height[:n] * scale
+        vx, vy, vw, vh = viewport
+        mask = t.alive[:n] & (left + width >= vx) & (left <= vx + vw) & (top + height >= vy) & (top <= vy + vh)
+        slots = np.flatnonzero(mask)
+        slots = slots[np.argsort(t.z[slots], kind="stable")]
+        # astype schneidet wie pg.Rect Richtung 0 ab
+        rects = np.stack((left[slots], top[slots], width[slots], height[slots]), axis=1).astype(np.int64)
+        return slots, rects
+
+    def socket_positions(self, node_slots, indices, is_input, offset, scale):
+        """Screen positions (int Nx2) of sockets given by node slot and socket index."""
+        t = self.nodes
+        x = t.x[node_slots]
+        if not is_input:
+            x = x + t.width[node_slots]
+        y = t.y[node_slots] + (self.header_height + (indices + 0.5) * self.line_height)
+        return np.stack((x * scale + offset[0], y * scale + offset[1]), axis=1).astype(np.int64)
+
+    def edge_lines(self, offset, scale, viewport):
+        """Straight lines (int Nx4) between the sockets of all visible edges, bottom to top,
+        and their colors."""
+        t = self.edges
+        n = t.end
+        alive = np.flatnonzero(t.alive[:n])
+        p1 = self.socket_positions(t.start_node[alive], t.start_index[alive], False, offset, scale)
+        p2 = self.socket_positions(t.end_node[alive], t.end_index[alive], True, offset, scale)
+        vx, vy, vw, vh = viewport
+        mask = ((np.maximum(p1[:, 0], p2[:, 0]) >= vx) & (np.minimum(p1[:, 0], p2[:, 0]) <= vx + vw) &
+                (np.maximum(p1[:, 1], p2[:, 1]) >= vy) & (np.minimum(p1[:, 1], p2[:, 1]) <= vy + vh))
+        order = np.flatnonzero(mask)
+        order = order[np.argsort(t.z[alive[order]], kind="stable")]
+        palette = self.palette
+        colors = [palette[i] for i in t.color[alive[order]].tolist()]
+        return colors, np.concatenate((p1[order], p2[order]), axis=1)
@@ -0,0 +1,180 @@
+"""
+Frame profiler with named timing scopes.
+
+    PROFILER.begin_frame()
+    with PROFILER.scope("events"):
+        ...
+    t = PROFILER.start()
+    ...
+    PROFILER.stop("update", t)
+    PROFILER.count("nodes drawn", len(nodes))
+    PROFILER.end_frame()
+
+Per frame the profiler keeps the frame time, the summed time of each scope,
+counters and gauges (values sampled at the end of the frame, e.g. cache hit
+rates) for the last `history` frames. draw_overlay shows them on screen,
+dump writes them as CSV or JSON.
+
+While disabled, scope() hands out one shared no-op context manager and
+all other calls return right away.
+"""
+import json
+from collections import deque
+from contextlib import nullcontext
+from time import perf_counter
+
+import pygame as pg
+
+_NULL_SCOPE = nullcontext()
+
+
+class _Scope:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        scopes = self.profiler._scopes
+        scopes[self.name] = scopes.get(self.name, 0.0) + perf_counter() - self.start
+        return False
+
+
+class FrameProfiler:
+    """Collects timings per frame; see module docstring."""
+    def __init__(self, history=300):
+        self.enabled = False
+        self.frames = deque(maxlen=history)
+        self.gauges = {}
+        self.frame_index = 0
+        self._scopes = {}
+        self._counts = {}
+        self._frame_start = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self._frame_start = None
+        return self.enabled
+
+    def add_gauge(self, name, fn):
+        """fn() is sampled at the end of every profiled frame."""
+        self.gauges[name] = fn
+
+    def scope(self, name):
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Scope(self, name)
+
+    def start(self):
+        """For regions that are no block: t = start() ... stop(name, t)."""
+        return perf_counter() if self.enabled else None
+
+    def stop(self, name, start):
+        if start is not None and self.enabled:
+            self._scopes[name] = self._scopes.get(name, 0.0) + perf_counter() - start
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self._counts[name] = self._counts.get(name, 0) + n
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._scopes = {}
+        self._counts = {}
+        self._frame_start = perf_counter()
+
+    def end_frame(self):
+        if not self.enabled or self._frame_start is None:
+            return
+        self.frames.append({
+            "frame": self.frame_index,
+            "frame_ms": (perf_counter() - self._frame_start) * 1000,
+            "scopes": {name: t * 1000 for name, t in self._scopes.items()},
+            "counts": self._counts,
+            "gauges": {name: fn() for name, fn in self.gauges.items()}
+        })
+        self.frame_index += 1
+
+    def clear(self):
+        self.frames.clear()
+
+    # --- Auswertung ---
+    def averages(self, last=60):
+        """(frame ms, {scope: ms}, {counter: n}) averaged over the last frames."""
+        frames = list(self.frames)[-last:]
+        if not frames:
+            return 0.0, {}, {}
+        scopes = {}
+        counts = {}
+        for frame in frames:
+            for name, ms in frame["scopes"].items():
+                scopes[name] = scopes.get(name, 0.0) + ms
+            for name, n in frame["counts"].items():
+                counts[name] = counts.get(name, 0) + n
+        n = len(frames)
+        frame_ms = sum(frame["frame_ms"] for frame in frames) / n
+        return frame_ms, {k: v / n for k, v in scopes.items()}, {k: v / n for k, v in counts.items()}
+
+    def dump(self, path):
+        """Writes all recorded frames; CSV for *.csv, otherwise JSON."""
+        frames = list(self.frames)
+        if not path.lower().endswith(".csv"):
+            with open(path, "w") as f:
+                json.dump(frames, f, indent=4)
+            return len(frames)
+
+        scope_names = sorted({name for frame in frames for name in frame["scopes"]})
+        count_names = sorted({name for frame in frames for name in frame["counts"]})
+        gauge_names = sorted({name for frame in frames for name in frame["gauges"]})
+        with open(path, "w") as f:
+            f.write(",".join(["frame", "frame_ms"] + scope_names + count_names + gauge_names) + "\n")
+            for frame in frames:
+                row = [frame["frame"], f"{frame['frame_ms']:.3f}"]
+                row += [f"{frame['scopes'].get(name, 0.0):.3f}" for name in scope_names]
+                row += [frame["counts"].get(name, 0) for name in count_names]
+                row += [frame["gauges"].get(name, "") for name in gauge_names]
+                f.write(",".join(map(str, row)) + "\n")
+        return len(frames)
+
+    # --- Overlay ---
+    def draw_overlay(self, surface, font, target_ms=1000 / 60):
+        """Histogram of the recorded frame times plus averaged scopes, counters and gauges.
+        Returns the screen rect of the overlay."""
+        width, graph_height = 260, 60
+        frame_ms, scopes, counts = self.averages()
+        lines = [f"frame {frame_ms:6.2f} ms"]
+        lines += [f"  {name:<12}{ms:6.2f} ms" for name, ms in sorted(scopes.items(), key=lambda item: -item[1])]
+        lines += [f"  {name:<16}{n:8.0f}" for name, n in counts.items()]
+        if self.frames:
+            lines += [f"  {name:<16}{value:8.1f}" for name, value in self.frames[-1]["gauges"].items()]
+
+        line_height = font.get_linesize()
+        height = graph_height + 10 + line_height * len(lines)
+        panel = pg.Surface((width, height), pg.SRCALPHA)
+        panel.fill((0, 0, 0, 190))
+
+        # Histogramm: ein Balken pro Frame, Linie = Zielframezeit
+        frames = list(self.frames)[-width:]
+        scale_ms = max(target_ms * 2, max((frame["frame_ms"] for frame in frames), default=0))
+        for i, frame in enumerate(frames):
+            bar = int(frame["frame_ms"] / scale_ms * graph_height)
+            color = (80, 200, 80) if frame["frame_ms"] <= target_ms else (220, 80, 60)
+            pg.draw.line(panel, color, (i, graph_height), (i, graph_height - bar))
+        target_y = graph_height - int(target_ms / scale_ms * graph_height)
+        pg.draw.line(panel, (200, 200, 200), (0, target_y), (width, target_y))
+
+        y = graph_height + 5
+        for line in lines:
+            # Ändert sich jeden Frame, daher nicht über TEXT_CACHE
+            panel.blit(font.render(line, True, (255, 255, 255)), (5, y))
+            y += line_height
+        return surface.blit(panel, (surface.get_width() - width, 0))
+
+
+PROFILER = FrameProfiler()
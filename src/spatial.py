@@ -0,0 +1,145 @@
+"""
+World-space spatial index for hit-testing and culling.
+
+Items (Nodes, Edges, ...) are stored in a uniform grid by their world-space
+bounds. Every item gets a z-value on insertion, so queries can return the
+topmost item first - the same order the editor draws in.
+
+Large items (long Edges) would be entered into hundreds of cells, so the
+grid has several levels with growing cell sizes and every item is stored
+in the finest level where it covers at most MAX_CELLS cells.
+"""
+
+
+class SpatialGrid:
+    """Hierarchical uniform grid that maps world-space rectangles to hashable items."""
+    MAX_CELLS = 4
+
+    def __init__(self, cell_size=256, levels=4, level_factor=8):
+        self.cell_size = cell_size
+        self.cell_sizes = [cell_size * level_factor ** i for i in range(levels)]
+        self.cells = [{} for _ in self.cell_sizes]
+        self.bounds = {}
+        self.z = {}
+        self._next_z = 0
+
+    def __len__(self):
+        return len(self.bounds)
+
+    def __contains__(self, item):
+        return item in self.bounds
+
+    def _cell_range(self, level, x, y, w, h):
+        cs = self.cell_sizes[level]
+        return (int(x // cs), int(y // cs), int((x + w) // cs), int((y + h) // cs))
+
+    def _placement(self, bounds):
+        """(level, cell range) for bounds."""
+        for level in range(len(self.cell_sizes)):
+            x0, y0, x1, y1 = cell_range = self._cell_range(level, *bounds)
+            if (x1 - x0 + 1) * (y1 - y0 + 1) <= self.MAX_CELLS:
+                break
+        return level, cell_range
+
+    def _add_to_cells(self, item, placement):
+        level, (x0, y0, x1, y1) = placement
+        cells = self.cells[level]
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cell = cells[(cx, cy)] = set()
+                cell.add(item)
+
+    def _remove_from_cells(self, item, placement):
+        level, (x0, y0, x1, y1) = placement
+        cells = self.cells[level]
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    continue
+                cell.discard(item)
+                if not cell:
+                    del cells[(cx, cy)]
+
+    def insert(self, item, bounds):
+        """Adds an item on top of all others. bounds = (x, y, w, h) in world space."""
+        if item in self.bounds:
+            self.remove(item)
+        bounds = tuple(bounds)
+        self.bounds[item] = bounds
+        self.z[item] = self._next_z
+        self._next_z += 1
+        self._add_to_cells(item, self._placement(bounds))
+
+    def remove(self, item):
+        bounds = self.bounds.pop(item, None)
+        if bounds is None:
+            return False
+        del self.z[item]
+        self._remove_from_cells(item, self._placement(bounds))
+        return True
+
+    def update(self, item, bounds):
+        """Moves/resizes an item while keeping its z-value."""
+        bounds = tuple(bounds)
+        old = self.bounds.get(item)
+        if old is None:
+            self.insert(item, bounds)
+            return
+        if old == bounds:
+            return
+        old_placement = self._placement(old)
+        placement = self._placement(bounds)
+        if old_placement != placement:
+            self._remove_from_cells(item, old_placement)
+            self._add_to_cells(item, placement)
+        self.bounds[item] = bounds
+
+    def replace(self, item, new_item):
+        """Swaps an item for another one with the same bounds and z-value."""
+        bounds = self.bounds.pop(item)
+        z = self.z.pop(item)
+        placement = self._placement(bounds)
+        self._remove_from_cells(item, placement)
+        self.bounds[new_item] = bounds
+        self.z[new_item] = z
+        self._add_to_cells(new_item, placement)
+
+    def clear(self):
+        for cells in self.cells:
+            cells.clear()
+        self.bounds.clear()
+        self.z.clear()
+        self._next_z = 0
+
+    def query_rect(self, x, y, w, h):
+        """Returns all items whose bounds intersect the rectangle (unordered)."""
+        found = set()
+        for level, cells in enumerate(self.cells):
+            if not cells:
+                continue
+            x0, y0, x1, y1 = self._cell_range(level, x, y, w, h)
+            if (x1 - x0 + 1) * (y1 - y0 + 1) > len(cells):
+                for cell in cells.values():
+                    found.update(cell)
+            else:
+                for cx in range(x0, x1 + 1):
+                    for cy in range(y0, y1 + 1):
+                        cell = cells.get((cx, cy))
+                        if cell:
+                            found.update(cell)
+        right, bottom = x + w, y + h
+        result = []
+        for item in found:
+            bx, by, bw, bh = self.bounds[item]
+            if bx <= right and by <= bottom and bx + bw >= x and by + bh >= y:
+                result.append(item)
+        return result
+
+    def query_point(self, x, y, margin=0):
+        """Returns the items around a point, topmost first."""
+        items = self.query_rect(x - margin, y - margin, margin * 2, margin * 2)
+        items.sort(key=self.z.__getitem__, reverse=True)
+        return items
@@ -0,0 +1,72 @@
+"""
+Shared LRU cache for rendered text surfaces.
+
+Labels in the editor (socket names, titles, panel buttons) are almost always
+the same few strings, so rendering them once per (font, size, text, color,
+antialias) and re-blitting the result saves most of the text cost.
+The returned surfaces are shared - only blit them, never draw onto them.
+"""
+from collections import OrderedDict
+
+
+class TextCache:
+    """Bounded LRU cache for font.render results with hit/miss counters."""
+    def __init__(self, max_entries=4096, max_sizes=16384):
+        self.max_entries = max_entries
+        self.max_sizes = max_sizes
+        self._surfaces = OrderedDict()
+        self._sizes = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        """Like font.render(text, antialias, color), but cached."""
+        key = (font, font.get_height(), text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def size(self, font, text):
+        """Measure-only path: (width, height) via font.size, without rendering."""
+        key = (font, font.get_height(), text)
+        size = self._sizes.get(key)
+        if size is not None:
+            self._sizes.move_to_end(key)
+            return size
+
+        size = font.size(text)
+        self._sizes[key] = size
+        if len(self._sizes) > self.max_sizes:
+            self._sizes.popitem(last=False)
+        return size
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            "entries": len(self._surfaces),
+            "sizes": len(self._sizes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate()
+        }
+
+    def clear(self):
+        self._surfaces.clear()
+        self._sizes.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+TEXT_CACHE = TextCache()
@@ -0,0 +1,68 @@
+"""
+Cubic Bézier helpers for drawing edges.
+
+Curves are tessellated into polylines once and then drawn with a single
+pg.draw.lines call. Edges tessellate in world space and cache the result,
+so a frame only has to apply the screen transform to the cached points.
+"""
+import pygame as pg
+
+MIN_SEGMENTS = 4
+MAX_SEGMENTS = 64
+PIXELS_PER_SEGMENT = 12
+
+
+def segments_for_length(length):
+    """Segment count for a curve of roughly `length` pixels on screen.
+
+    Counts are powers of two, so small zoom changes do not force a re-tessellation.
+    """
+    segments = MIN_SEGMENTS
+    while segments < MAX_SEGMENTS and segments * PIXELS_PER_SEGMENT < length:
+        segments *= 2
+    return segments
+
+
+def estimate_length(points):
+    """Length of the control polygon (upper bound of the curve length)."""
+    length = 0.0
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        length += abs(x2 - x1) + abs(y2 - y1)
+    return length
+
+
+def tessellate(points, segments):
+    """Returns segments + 1 points on the cubic curve given by 4 control points."""
+    (x1, y1), (x2, y2), (x3, y3), (x4, y4) = points
+    result = []
+    step = 1.0 / segments
+    for i in range(segments + 1):
+        t = i * step
+        u = 1.0 - t
+        a = u * u * u
+        b = 3 * u * u * t
+        c = 3 * u * t * t
+        d = t * t * t
+        result.append((a * x1 + b * x2 + c * x3 + d * x4, a * y1 + b * y2 + c * y3 + d * y4))
+    return result
+
+
+def transform(points, offset, scale):
+    """World -> screen for a whole polyline in one pass."""
+    ox, oy = offset
+    return [(x * scale + ox, y * scale + oy) for x, y in points]
+
+
+def bounds(points):
+    """(x, y, w, h) of a polyline or control polygon."""
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    x, y = min(xs), min(ys)
+    return (x, y, max(xs) - x, max(ys) - y)
+
+
+def draw_beziere(surface, points, color=(255, 255, 255), width=1, segments=None):
+    """Draws a cubic Bézier curve given in screen coordinates."""
+    if segments is None:
+        segments = segments_for_length(estimate_length(points))
+    pg.draw.lines(surface, color, False, tessellate(points, segments), width)
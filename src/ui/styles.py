@@ -0,0 +1,76 @@
+"""
+Shared UX state sets for the pig_ui widgets.
+
+A UXWrapper takes four state lists (normal, hover, press, disabled) of UX
+objects. Widgets of the same kind all build identical lists, so the registry
+builds them once per (size, palette) and hands out the same lists to every
+instance. Only the UXWrapper around them stays per element. Hex colors are
+parsed once.
+
+The UX objects are shared, so never change them on a single widget.
+"""
+from pygame import Color, Vector2
+from pig_ui import UXRect, UXText
+
+STATES = 4
+
+
+class StyleRegistry:
+    """Interns Colors and UX state lists; see module docstring."""
+    def __init__(self):
+        self.enabled = True
+        self._colors = {}
+        self._states = {}
+        self.hits = 0
+        self.misses = 0
+
+    def color(self, value):
+        """Color for a hex string (or anything Color accepts), parsed once."""
+        if not self.enabled:
+            return Color(value)
+        color = self._colors.get(value)
+        if color is None:
+            color = self._colors[value] = Color(value)
+        return color
+
+    def palette(self, normal, active=None):
+        """Per-state colors: normal for the first state, active (default normal) for the others."""
+        return (normal,) + (active or normal,) * (STATES - 1)
+
+    def _get(self, key, build):
+        if not self.enabled:
+            return build()
+        states = self._states.get(key)
+        if states is None:
+            self.misses += 1
+            states = self._states[key] = build()
+        else:
+            self.hits += 1
+        return states
+
+    def rect_states(self, size, palette):
+        """[[UXRect]] per state, filled with the palette colors."""
+        size = (int(size[0]), int(size[1]))
+        return self._get(("rect", size, palette), lambda: [
+            [UXRect(-1, self.color(palette[i]), size=Vector2(size))] for i in range(STATES)
+        ])
+
+    def label_rect_states(self, size, palette, text, text_pos, text_color):
+        """[[UXRect, UXText]] per state, e.g. a socket with its name."""
+        size = (int(size[0]), int(size[1]))
+        text_pos = (int(text_pos[0]), int(text_pos[1]))
+        return self._get(("label_rect", size, palette, text, text_pos, text_color), lambda: [
+            [
+                UXRect(-1, self.color(palette[i]), size=Vector2(size)),
+                UXText(Vector2(text_pos), self.color(text_color), 0, text)
+            ] for i in range(STATES)
+        ])
+
+    def clear(self):
+        self._colors.clear()
+        self._states.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+STYLES = StyleRegistry()
@@ -1,13 +1,61 @@
 from pig_ui import UIElement
 from pig_ui import UITextInput
 from src.constants import *
+from src.text_cache import TEXT_CACHE
+from src.ui.styles import STYLES
 from typing import Any
 """
 A Node will be bu
 """
 
+SOCKET_SIZE = 8
+NODE_PALETTE = STYLES.palette('#242424', '#484848')
+SOCKET_PALETTE = STYLES.palette('#1f8fc0', '#6db8d8')
+SOCKET_COLOR = STYLES.color(SOCKET_PALETTE[0])
+SOCKET_HOVER_COLOR = STYLES.color(SOCKET_PALETTE[1])
+SOCKET_TEXT_COLOR = STYLES.color('#ffffff')
+
+class SocketTable:
+    """Sockets of a UINode as plain rows (is_input, name, type, x, y) instead of one
+    UIElement each. Tables are shared by all nodes with the same sockets and width."""
+    __slots__ = ("rows",)
+    _tables = {}
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def get(cls, in_out, width, header, space):
+        key = (tuple((is_input, name, type) for is_input, name, type in in_out), width, header, space)
+        table = cls._tables.get(key)
+        if table is None:
+            table = cls._tables[key] = cls(tuple(
+                (is_input, name, type, 0 if is_input else width - SOCKET_SIZE, header + space + (idx * 24))
+                for idx, (is_input, name, type) in enumerate(key[0])
+            ))
+        return table
+
+    def __len__(self):
+        return len(self.rows)
+
+    def index_at(self, local_pos):
+        """Index of the socket under local_pos (relative to the node) or None."""
+        x, y = local_pos
+        for idx, row in enumerate(self.rows):
+            if row[3] <= x < row[3] + SOCKET_SIZE and row[4] <= y < row[4] + SOCKET_SIZE:
+                return idx
+        return None
+
+    def draw(self, surface, origin, font, hovered=None):
+        ox, oy = int(origin[0]), int(origin[1])
+        for idx, (is_input, name, type, x, y) in enumerate(self.rows):
+            color = SOCKET_HOVER_COLOR if idx == hovered else SOCKET_COLOR
+            surface.fill(color, (ox + x, oy + y, SOCKET_SIZE, SOCKET_SIZE))
+            text = TEXT_CACHE.render(font, name, SOCKET_TEXT_COLOR)
+            surface.blit(text, (ox + x + (SOCKET_SIZE if is_input else -70), oy + y))
+
 class UINode(UIElement):
-    def __init__(self, app, pos,in_out: list[list[bool, str, Any]], **kwargs):
+    def __init__(self, app, pos,in_out: list[list[bool, str, Any]], compact_sockets=None, **kwargs):
         l = len(in_out)
         header = 16
         id = 8
@@ -16,26 +64,27 @@ class UINode(UIElement):
         h = header + (l * (row + space)) + id
         size = Vector2(144,h)
         
-        ux = [
-            [UXRect(-1,Color('#242424' if i < 1 else '#484848'),size=size)] for i in range(4)
-        ]
+        # Geteilte UX-Zustände (src/ui/styles.py), nur der Wrapper gehört dem Node
+        ux = STYLES.rect_states(size, NODE_PALETTE)
         
         super().__init__(app, pos, size, UXWrapper(ux), True, anchor = 'tl', **kwargs)
         self.sub = []
         self.texts = []
+        self.hovered_socket = None
+        if compact_sockets is None:
+            compact_sockets = UINODE_COMPACT_SOCKETS
+        # Kompakt: Sockets zeichnet und trifft der Node selbst, nichts davon landet im App-UIManager
+        self.sockets = SocketTable.get(in_out, int(self.size.x), header, space) if compact_sockets else None
         for idx, (is_input, name, type) in enumerate(in_out):
             #+ Knot
             #+ Input
             self.texts.append(name)
+            if self.sockets is not None:
+                continue
             
             p = Vector2(0 if is_input else self.size.x - 8,header + space + (idx * 24))
 
-            ux = [
-            [
-                UXRect(-1,Color('#1f8fc0' if i < 1 else "#6db8d8"),size=Vector2(8,8)),
-                UXText(Vector2(8 if is_input else -70,0),Color('#ffffff'),0,name)
-                ] for i in range(4)
-            ]
+            ux = STYLES.label_rect_states((8, 8), SOCKET_PALETTE, name, (8 if is_input else -70, 0), '#ffffff')
             uie = UIElement(
                 app,
                 p,
@@ -45,4 +94,19 @@ class UINode(UIElement):
                 anchor = 'tl'
             )
             self.sub.append(uie)
-            ...
\ No newline at end of file
+
+    def get_socket_at(self, pos):
+        """(is_input, name, type) of the socket at the screen position pos or None."""
+        if self.sockets is None:
+            return None
+        idx = self.sockets.index_at((pos[0] - self.pos.x, pos[1] - self.pos.y))
+        return None if idx is None else self.sockets.rows[idx][:3]
+
+    def draw(self, surface, *args, **kwargs):
+        # Annahmen (nur gegen einen Ersatz von pig_ui geprüft, daher UINODE_COMPACT_SOCKETS opt-in):
+        # pig_ui ruft draw(surface, ...) auf und self.pos ist die Bildschirmposition oben links
+        super().draw(surface, *args, **kwargs)
+        if self.sockets is not None:
+            mouse = pg.mouse.get_pos()
+            self.hovered_socket = self.sockets.index_at((mouse[0] - self.pos.x, mouse[1] - self.pos.y))
+            self.sockets.draw(surface, self.pos, NORM_FONT, self.hovered_socket)